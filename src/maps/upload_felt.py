@@ -1,20 +1,74 @@
+import json
 import os
 import tempfile
 import felt_python
+import requests
 import xarray as xr
 import rioxarray
 from dotenv import load_dotenv
+from felt_python.api import make_request
+from felt_python.layers import LAYER_UPLOAD
+
+from src.utils.raster_io import IN_MEMORY_MAX_BYTES, to_geotiff_bytes
 
 load_dotenv()
 
-def upload_xarray_to_felt(dataset: xr.DataArray, map_title: str, api_token: str = None) -> str:
+
+def _create_map(map_title: str, api_token: str):
+    """Create a Felt map and return its (id, url)."""
+    print(f"Creating new map on Felt: '{map_title}'")
+    map_details = felt_python.create_map(title=map_title, api_token=api_token)
+
+    # Handle response type (id might be an attribute or dict key)
+    if hasattr(map_details, 'id'):
+        return map_details.id, map_details.url
+    return map_details['id'], map_details['url']
+
+
+def upload_bytes_to_felt(map_id: str, data: bytes, file_name: str, layer_name: str, api_token: str):
+    """
+    Uploads an in-memory file to a Felt map, mirroring `felt_python.upload_file` without a file path.
+
+    Args:
+        map_id (str): The Felt map to upload to.
+        data (bytes): The encoded file contents.
+        file_name (str): File name reported to Felt; its extension drives format detection.
+        layer_name (str): Display name for the new layer.
+        api_token (str): Felt API token.
+
+    Returns:
+        dict: The presigned upload response, including the layer ID.
+    """
+    response = make_request(
+        url=LAYER_UPLOAD.format(map_id=map_id),
+        method="POST",
+        api_token=api_token,
+        json={"name": layer_name},
+    )
+    presigned_upload = json.load(response)
+
+    upload = requests.post(
+        presigned_upload["url"],
+        data=presigned_upload["presigned_attributes"],
+        files={"file": (file_name, data, "application/octet-stream")},
+    )
+    upload.raise_for_status()
+    return presigned_upload
+
+
+def upload_xarray_to_felt(dataset: xr.DataArray, map_title: str, api_token: str = None,
+                          in_memory_max_bytes: int = IN_MEMORY_MAX_BYTES) -> str:
     """
     Uploads an Xarray DataArray to Felt as a raster layer.
 
+    Rasters up to `in_memory_max_bytes` are encoded and uploaded entirely in
+    memory; larger ones go through a temporary GeoTIFF on disk.
+
     Args:
         dataset (xr.DataArray): The geospatial data to upload. Must have geospatial coordinates.
         map_title (str): Title for the new map on Felt.
         api_token (str, optional): Felt API token. If None, checks FELT_ACCESS_TOKEN env var.
+        in_memory_max_bytes (int, optional): Largest raster encoded in memory.
 
     Returns:
         str: The URL of the created map.
@@ -25,6 +79,25 @@ def upload_xarray_to_felt(dataset: xr.DataArray, map_title: str, api_token: str
         if not api_token:
             raise ValueError("FELT_ACCESS_TOKEN not found in environment variables or arguments.")
 
+    layer_name = dataset.name or "Raster Layer"
+
+    if dataset.nbytes <= in_memory_max_bytes:
+        try:
+            print("Encoding Xarray dataset to an in-memory GeoTIFF")
+            data = to_geotiff_bytes(dataset)
+
+            map_id, map_url = _create_map(map_title, api_token)
+
+            print(f"Uploading file to Felt map {map_id}...")
+            upload_bytes_to_felt(map_id, data, f"{layer_name}.tif", layer_name, api_token)
+
+            print(f"Upload initiated successfully. Map URL: {map_url}")
+            return map_url
+
+        except Exception as e:
+            print(f"An error occurred during Felt upload: {e}")
+            raise
+
     # Create a temporary file to save the raster
     with tempfile.NamedTemporaryFile(suffix=".tif", delete=False) as tmp_file:
         temp_path = tmp_file.name
@@ -34,24 +107,15 @@ def upload_xarray_to_felt(dataset: xr.DataArray, map_title: str, api_token: str
         print(f"Exporting Xarray dataset to temporary GeoTIFF: {temp_path}")
         dataset.rio.to_raster(temp_path)
 
-        print(f"Creating new map on Felt: '{map_title}'")
         # Create map
-        map_details = felt_python.create_map(title=map_title, api_token=api_token)
-        
-        # Handle response type (id might be an attribute or dict key)
-        if hasattr(map_details, 'id'):
-            map_id = map_details.id
-            map_url = map_details.url
-        else:
-            map_id = map_details['id']
-            map_url = map_details['url']
+        map_id, map_url = _create_map(map_title, api_token)
 
         print(f"Uploading file to Felt map {map_id}...")
         # Upload the raster file
         felt_python.upload_file(
             map_id=map_id,
             file_name=temp_path,
-            layer_name=dataset.name or "Raster Layer",
+            layer_name=layer_name,
             api_token=api_token
         )
         
@@ -11,10 +11,21 @@ def _():
     import json
     import os
     import xarray as xr
+    import polars as pl
     from dotenv import load_dotenv
+    from src.utils.cecil_cache import CachedCecilClient, load_subscriptions
+    from src.utils.land_cover import SBTN_NATURAL_LANDS
 
     load_dotenv()
-    return cecil, json, mo
+    return (
+        CachedCecilClient,
+        SBTN_NATURAL_LANDS,
+        cecil,
+        json,
+        load_subscriptions,
+        mo,
+        pl,
+    )
 
 
 @app.cell
@@ -28,8 +39,9 @@ def _(mo):
 
 
 @app.cell
-def _(cecil):
-    client = cecil.Client()
+def _(CachedCecilClient, cecil):
+    # Subscriptions are cached as local Zarr stores under data/cache/cecil
+    client = CachedCecilClient(cecil.Client())
     return (client,)
 
 
@@ -43,34 +55,32 @@ def _(json, mo):
 
 
 @app.cell
-def _(client, subscriptions):
-    results = []
-
-    for sub in subscriptions:
-        sub_id = sub["id"]
-        sub_name = sub.get("name", "Unknown")
-        dataset_id = sub.get("dataset_id")
-
-        try:
-            # We use the 'id' from the subscription JSON as the subscription_id for load_xarray
-            ds = client.load_xarray(subscription_id=sub_id)
-
-            summary = {
-                "name": sub_name,
-                "id": sub_id,
-                "dataset_id": dataset_id,
-                "dims": dict(ds.sizes),
-                "data_vars": list(ds.data_vars.keys()),
-                "coords": list(ds.coords.keys()),
-                "stats": {}
-            }
-            print(summary)
-
-            # Calculate basic stats for each data variable
-            results.append((sub, ds, summary))
-
-        except Exception as e:
-            results.append((sub, None, {"error": str(e)}))
+def _(SBTN_NATURAL_LANDS, client, load_subscriptions, mo, pl, subscriptions):
+    # Load every subscription concurrently; failures are reported instead of raised
+    datasets, load_report = load_subscriptions(client, subscriptions)
+
+    for summary in load_report:
+        print(summary)
+
+    _load_df = pl.DataFrame([
+        {"name": r["name"], "seconds": r["seconds"], "error": r["error"]} for r in load_report
+    ])
+
+    # The analysis below uses the SBTN Natural Lands dataset; stop here if it failed to load
+    _sbtn_errors = [r["error"] for r in load_report if r["name"] == SBTN_NATURAL_LANDS.name and r["error"]]
+    mo.stop(
+        SBTN_NATURAL_LANDS.name not in datasets,
+        mo.vstack([
+            mo.callout(mo.md(
+                f"**{SBTN_NATURAL_LANDS.name}** could not be loaded: "
+                f"{_sbtn_errors[0] if _sbtn_errors else 'no matching subscription in the subscriptions file'}"
+            ), kind="danger"),
+            _load_df
+        ])
+    )
+    ds = datasets[SBTN_NATURAL_LANDS.name]
+
+    _load_df
     return (ds,)
 
 
@@ -95,7 +105,7 @@ def _():
 
 
 @app.cell
-def _(ds):
+def _(ds, pl):
     # Display detailed information about each variable
     var_info = []
     for var_name in ds.data_vars:
@@ -108,10 +118,9 @@ def _(ds):
             "Description": da.attrs.get("long_name", "N/A")
         })
 
-    import polars as pl
     var_df = pl.DataFrame(var_info)
     var_df
-    return (pl,)
+    return
 
 
 @app.cell
@@ -120,7 +129,7 @@ def _():
 
 
 @app.cell
-def _(ds, mo, pl):
+def _(SBTN_NATURAL_LANDS, ds, mo, pl):
     # Extract the natural lands data
     # Based on SBTN Natural Lands documentation, this should contain binary classification
     natural_lands = ds['binary_class']
@@ -128,20 +137,14 @@ def _(ds, mo, pl):
     # Convert to numpy for analysis
     natural_data = natural_lands.values
 
-    # Calculate statistics
+    # Calculate statistics: pixels per category (Natural, Non-Natural, Unknown/No Data)
     total_pixels = natural_data.size
-    natural_pixels = (natural_data == 1).sum()
-    non_natural_pixels = (natural_data == 0).sum()
-    unknown_pixels = total_pixels - natural_pixels - non_natural_pixels
+    category_pixels = SBTN_NATURAL_LANDS.count(natural_data)
 
     stats_df = pl.DataFrame({
-        "Category": ["Natural", "Non-Natural", "Unknown/No Data"],
-        "Pixels": [int(natural_pixels), int(non_natural_pixels), int(unknown_pixels)],
-        "Percentage": [
-            100 * natural_pixels / total_pixels,
-            100 * non_natural_pixels / total_pixels,
-            100 * unknown_pixels / total_pixels
-        ]
+        "Category": pl.Series(list(category_pixels), dtype=SBTN_NATURAL_LANDS.dtype),
+        "Pixels": list(category_pixels.values()),
+        "Percentage": [100 * pixels / total_pixels for pixels in category_pixels.values()]
     })
 
     mo.vstack([
@@ -152,7 +155,7 @@ def _(ds, mo, pl):
 
 
 @app.cell
-def _(pl, stats_df):
+def _(SBTN_NATURAL_LANDS, pl, stats_df):
     import altair as alt
 
     # Create a pie chart showing natural vs non-natural land
@@ -162,8 +165,8 @@ def _(pl, stats_df):
             field="Category",
             type="nominal",
             scale=alt.Scale(
-                domain=["Natural", "Non-Natural", "Unknown/No Data"],
-                range=["#2d7f3e", "#c44e52", "#cccccc"]
+                domain=SBTN_NATURAL_LANDS.labels,
+                range=SBTN_NATURAL_LANDS.palette
             ),
             legend=alt.Legend(title="Land Type")
         ),
@@ -188,7 +191,7 @@ def _():
 
 
 @app.cell
-def _(alt, pl, stats_df):
+def _(SBTN_NATURAL_LANDS, alt, pl, stats_df):
     # Create a bar chart for easier comparison
     bar_chart = alt.Chart(stats_df.filter(pl.col("Pixels") > 0)).mark_bar().encode(
         x=alt.X("Category:N", title="Land Type", sort=None),
@@ -196,8 +199,8 @@ def _(alt, pl, stats_df):
         color=alt.Color(
             "Category:N",
             scale=alt.Scale(
-                domain=["Natural", "Non-Natural", "Unknown/No Data"],
-                range=["#2d7f3e", "#c44e52", "#cccccc"]
+                domain=SBTN_NATURAL_LANDS.labels,
+                range=SBTN_NATURAL_LANDS.palette
             ),
             legend=None
         ),
@@ -222,7 +225,7 @@ def _(natural_data):
 
 
 @app.cell
-def _(alt, ds, natural_data_reshaped, pl):
+def _(SBTN_NATURAL_LANDS, alt, ds, natural_data_reshaped, pl):
     # Create a spatial heatmap visualization
     import numpy as np
 
@@ -239,7 +242,7 @@ def _(alt, ds, natural_data_reshaped, pl):
                 spatial_data.append({
                     "x": float(x),
                     "y": float(y),
-                    "natural": "Natural" if value == 1 else "Non-Natural"
+                    "natural": SBTN_NATURAL_LANDS.classes.get(int(value), SBTN_NATURAL_LANDS.unknown)
                 })
 
     spatial_df = pl.DataFrame(spatial_data)
@@ -251,8 +254,8 @@ def _(alt, ds, natural_data_reshaped, pl):
         color=alt.Color(
             'natural:N',
             scale=alt.Scale(
-                domain=["Natural", "Non-Natural"],
-                range=["#2d7f3e", "#c44e52"]
+                domain=SBTN_NATURAL_LANDS.labels[:-1],
+                range=SBTN_NATURAL_LANDS.palette[:-1]
             ),
             legend=alt.Legend(title="Land Type")
         ),
@@ -276,7 +279,7 @@ def _(mo):
 
 
 @app.cell
-def _(pl):
+def _(SBTN_NATURAL_LANDS, pl):
     from pathlib import Path
     from datetime import datetime
 
@@ -297,8 +300,8 @@ def _(pl):
             Markdown-formatted string containing the complete report
         """
         # Extract statistics
-        natural_stats = stats_dataframe.filter(pl.col("Category") == "Natural")
-        non_natural_stats = stats_dataframe.filter(pl.col("Category") == "Non-Natural")
+        natural_stats = stats_dataframe.filter(pl.col("Category") == SBTN_NATURAL_LANDS.classes[1])
+        non_natural_stats = stats_dataframe.filter(pl.col("Category") == SBTN_NATURAL_LANDS.classes[0])
 
         natural_pct = natural_stats["Percentage"][0] if len(natural_stats) > 0 else 0
         non_natural_pct = non_natural_stats["Percentage"][0] if len(non_natural_stats) > 0 else 0
@@ -16,29 +16,54 @@ def _():
     import pystac
     import json
     import os
-    import tempfile
-    import requests
     import rioxarray
     from datetime import datetime
     from pathlib import Path
     from dotenv import load_dotenv
+    from src.utils.ee_fetch import get_ee_stack, print_progress, raster_grid
+    from src.utils.geometry import geometry_summary
+    from src.utils.hotspots import find_hotspots, hotspot_polygons
+    from src.utils.cecil_cache import CachedCecilClient
+    from src.utils.change_detection import detect_changes
+    from src.utils.land_cover import LAND_COVER_9_CLASS
+    from src.utils.raster_cache import RasterCache
+    from src.utils.reproject import reproject_match
+    from src.utils.temporal import reduce_latest, reduce_mode
+    from src.utils.pixel_area import pixel_areas
+    from src.utils.windowed_join import JoinDiagnostics, windowed_join
+    from src.utils.zonal_stats import transition_matrix, windowed_stats
 
     load_dotenv()
     return (
+        CachedCecilClient,
+        JoinDiagnostics,
+        LAND_COVER_9_CLASS,
         Path,
+        RasterCache,
         alt,
         cecil,
         datetime,
+        detect_changes,
         ee,
+        find_hotspots,
+        geometry_summary,
+        get_ee_stack,
+        hotspot_polygons,
         json,
         mo,
         np,
         os,
+        pixel_areas,
         pl,
+        print_progress,
         pystac,
-        requests,
-        rioxarray,
-        tempfile,
+        raster_grid,
+        reduce_latest,
+        reduce_mode,
+        reproject_match,
+        transition_matrix,
+        windowed_join,
+        windowed_stats,
         xr,
     )
 
@@ -60,7 +85,7 @@ def _(mo):
 
 
 @app.cell
-def _(Path, ee, json, os):
+def _(Path, ee, geometry_summary, json, os):
     # Configuration
     CONFIG = {
         'project_id': os.getenv('GEE_PROJECT_ID'), 
@@ -74,6 +99,32 @@ def _(Path, ee, json, os):
         'zoom_level': 14,
         'satellite': 'COPERNICUS/S2_SR_HARMONIZED',
         'scale': 10,
+        # Spectral indices fetched alongside NDVI in the same request (NDVI, NDBI, NDWI)
+        'indices': ['NDVI'],
+        # 'download' (GeoTIFF via getDownloadURL) or 'xee' (lazy chunks fetched on demand)
+        'engine': 'download',
+        # Request Earth Engine output on the Cecil grid so the join needs no resampling
+        'align_to_cecil': False,
+        'cecil_crs': 'EPSG:3857',
+        # Split downloads into parallel tiles when the AOI exceeds EE's per-request limits
+        'tiling': 'auto',
+        'tile_size': None,
+        'tile_workers': 8,
+        # Downloads up to this size are decoded in memory instead of via /tmp
+        'in_memory_max_bytes': 256 * 1024 ** 2,
+        # Local cache of downloaded NDVI rasters; set refresh_cache to force a re-download
+        'cache_dir': Path('data/cache/ee'),
+        'cache_max_bytes': 2 * 1024 ** 3,
+        'refresh_cache': False,
+        # Local Zarr copies of Cecil subscriptions, re-fetched once older than a week
+        'cecil_cache_dir': Path('data/cache/cecil'),
+        # Set to a directory to join window by window into Zarr stores (large AOIs)
+        'join_store_dir': None,
+        'join_window_size': 2048,
+        'join_diagnostics': True,
+        # Connected patches with |Δ NDVI| above the threshold, dropping patches below min pixels
+        'hotspot_threshold': 0.1,
+        'hotspot_min_pixels': 10,
         'vis_params': {
             'min': 0,
             'max': 3000,
@@ -94,16 +145,24 @@ def _(Path, ee, json, os):
         expanded_geojson_data = json.load(f_aoi)
 
     aoi_geometry = ee.FeatureCollection(expanded_geojson_data['features']).geometry()
-    return CONFIG, aoi_geometry
+
+    # Area, bbox and centroid of all AOI features, computed locally (no getInfo)
+    aoi_summary = geometry_summary(expanded_geojson_data)
+    # Grid planning for tiled and xee fetches uses this bbox instead of aoi_geometry.bounds().getInfo()
+    CONFIG['aoi_bounds'] = aoi_summary.bbox
+    return CONFIG, aoi_geometry, aoi_summary
 
 
 @app.cell
-def _(CONFIG, cecil, mo):
-    # Load Cecil Data
-    client = cecil.Client()
+def _(CONFIG, CachedCecilClient, cecil, mo):
+    # Load Cecil Data (served lazily from the local Zarr cache after the first run)
+    client = CachedCecilClient(cecil.Client(), cache_dir=CONFIG['cecil_cache_dir'])
     print(f"Loading Cecil Dataset ID: {CONFIG['cecil_dataset_id']}...")
     try:
-        cecil_ds = client.load_xarray(subscription_id=CONFIG['cecil_dataset_id'])
+        cecil_ds = client.load_xarray(
+            subscription_id=CONFIG['cecil_dataset_id'],
+            refresh=CONFIG['refresh_cache']
+        )
         print("Cecil Dataset loaded successfully.")
 
         # Filter for the two time windows
@@ -126,44 +185,34 @@ def _(CONFIG, cecil, mo):
 
 
 @app.cell
-def _(CONFIG, aoi_geometry, ee):
-    def get_ee_xarray(start_date, end_date):
-        """Get EE data using EE's native download URL"""
-        collection = (ee.ImageCollection(CONFIG['satellite'])
-            .filterDate(start_date, end_date)
-            .filterBounds(aoi_geometry)
-            .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', CONFIG['cloud_threshold'])))
-
-        composite = collection.median().clip(aoi_geometry)
-        ndvi = composite.normalizedDifference(['B8', 'B4']).rename('NDVI')
-
-        # Get download URL directly from EE (uses your authenticated project)
-        url = ndvi.getDownloadURL({
-            'scale': CONFIG['scale'],
-            'region': aoi_geometry,
-            'crs': 'EPSG:4326',
-            'format': 'GEO_TIFF'
-        })
-
-        # Download the file
-        tmp_file = tempfile.mktemp(suffix='.tif')
-        response = requests.get(url)
-
-        with open(tmp_file, 'wb') as f:
-            f.write(response.content)
-
-        # Load the file
-        ds = rioxarray.open_rasterio(tmp_file).to_dataset(name='NDVI')
-
-        # Clean up
-        # Clean up
-        import os
-        os.remove(tmp_file)
-
-        return ds
-
-    ee_ds_22 = get_ee_xarray(CONFIG['date_start_1'], CONFIG['date_end_1'])
-    ee_ds_24 = get_ee_xarray(CONFIG['date_start_2'], CONFIG['date_end_2'])
+def _(
+    CONFIG,
+    RasterCache,
+    aoi_geometry,
+    cecil_22,
+    get_ee_stack,
+    print_progress,
+    raster_grid,
+):
+    # Fetch both periods (and any extra indices) as one stacked multi-band request
+    period_1 = (CONFIG['date_start_1'], CONFIG['date_end_1'])
+    period_2 = (CONFIG['date_start_2'], CONFIG['date_end_2'])
+
+    ee_config = dict(CONFIG)
+    if CONFIG['align_to_cecil'] and cecil_22 is not None:
+        # Both periods share the Cecil grid, so either window describes it
+        cecil_layer = cecil_22[list(cecil_22.data_vars)[0]]
+        ee_config['grid'] = raster_grid(cecil_layer, default_crs=CONFIG['cecil_crs'])
+
+    ee_cache = RasterCache(CONFIG['cache_dir'], max_bytes=CONFIG['cache_max_bytes'])
+    ee_datasets = get_ee_stack(
+        ee_config, aoi_geometry, [period_1, period_2],
+        indices=CONFIG['indices'],
+        progress=print_progress("Earth Engine download"),
+        cache=ee_cache, refresh=CONFIG['refresh_cache']
+    )
+    ee_ds_22 = ee_datasets[period_1]
+    ee_ds_24 = ee_datasets[period_2]
 
     print(f"EE 2022 shape: {ee_ds_22['NDVI'].shape}")
     print(f"EE 2024 shape: {ee_ds_24['NDVI'].shape}")
@@ -171,10 +220,21 @@ def _(CONFIG, aoi_geometry, ee):
 
 
 @app.cell
-def _(np, xr):
-    def join_datasets(ee_data, cecil_data, time_method='first'):
+def _(JoinDiagnostics, reduce_latest, reduce_mode, reproject_match, windowed_join, xr):
+    def join_datasets(ee_data, cecil_data, time_method='first', store=None,
+                      window_size=2048, diagnostics=True):
         """
         Join Earth Engine and Cecil datasets with proper CRS handling.
+
+        `time_method` collapses a multi-step Cecil cube: 'first', 'mean' and
+        'median' as before, or the categorical-safe 'mode' (per-pixel majority
+        class) and 'latest' (most recent valid value), which stream over time
+        without loading the whole cube.
+
+        With `store` set, the join runs window by window (`window_size` pixels
+        square) into that Zarr store and returns it lazily opened, keeping peak
+        memory bounded for large AOIs. `diagnostics` toggles the summary prints,
+        which are gathered in the same pass.
         """
         if cecil_data is None or ee_data is None:
             raise ValueError("Both datasets must be provided")
@@ -190,6 +250,12 @@ def _(np, xr):
                 cecil_static = cecil_data.mean(dim='time')
             elif time_method == 'median':
                 cecil_static = cecil_data.median(dim='time')
+            elif time_method == 'mode':
+                cecil_static = reduce_mode(cecil_data[var_name]).to_dataset(name=var_name)
+            elif time_method == 'latest':
+                cecil_static = reduce_latest(cecil_data[var_name]).to_dataset(name=var_name)
+            else:
+                raise ValueError(f"Unknown time_method: {time_method}")
         else:
             cecil_static = cecil_data.isel(time=0) if 'time' in cecil_data.dims else cecil_data
 
@@ -199,15 +265,25 @@ def _(np, xr):
         else:
             ee_spatial = ee_data['NDVI']
 
-        # Set up CRS for both datasets
+        # Set up CRS for both datasets where it is not already recorded
         # Cecil is in Web Mercator (EPSG:3857) based on coordinate values
-        cecil_with_crs = cecil_static[var_name].rio.write_crs("EPSG:3857", inplace=True)
+        cecil_layer = cecil_static[var_name]
+        if cecil_layer.rio.crs is None:
+            cecil_layer = cecil_layer.rio.write_crs("EPSG:3857")
+
+        # EE is in geographic coordinates (EPSG:4326) unless it was requested on the Cecil grid
+        if ee_spatial.rio.crs is None:
+            ee_spatial = ee_spatial.rio.write_crs("EPSG:4326")
 
-        # EE is in geographic coordinates (EPSG:4326)
-        ee_with_crs = ee_spatial.rio.write_crs("EPSG:4326", inplace=True)
+        if store is not None:
+            return windowed_join(ee_spatial, cecil_layer, store,
+                                 window_size=window_size, diagnostics=diagnostics)
 
-        # Reproject Cecil from Web Mercator to Geographic to match EE
-        cecil_reprojected = cecil_static[var_name].rio.reproject_match(ee_spatial)
+        # Reproject Cecil from Web Mercator to Geographic to match EE.
+        # The nearest-neighbour plan is cached per (source grid, target grid), so
+        # every period after the first is a plain NumPy gather; when EE was
+        # requested on the Cecil grid this is only a coordinate alignment.
+        cecil_reprojected = reproject_match(cecil_layer, ee_spatial)
 
         # Create combined dataset
         combined = xr.Dataset({
@@ -215,20 +291,32 @@ def _(np, xr):
             'land_cover': cecil_reprojected
         })
 
-        print(f"Combined NDVI shape: {combined['NDVI'].shape}")
-        print(f"Combined land_cover shape: {combined['land_cover'].shape}")
-        print(f"land_cover has data: {not np.isnan(combined['land_cover'].values).all()}")
-        print(f"land_cover unique values: {np.unique(combined['land_cover'].values[~np.isnan(combined['land_cover'].values)])}")
+        if diagnostics:
+            summary = JoinDiagnostics()
+            summary.update(combined['NDVI'].values, combined['land_cover'].values)
+            summary.print(combined['NDVI'].shape)
 
         return combined
     return (join_datasets,)
 
 
 @app.cell
-def _(cecil_22, cecil_24, ee_ds_22, ee_ds_24, join_datasets, mo):
+def _(CONFIG, cecil_22, cecil_24, ee_ds_22, ee_ds_24, join_datasets, mo):
+    join_kwargs = {
+        'window_size': CONFIG['join_window_size'],
+        'diagnostics': CONFIG['join_diagnostics']
+    }
+    join_store_dir = CONFIG['join_store_dir']
+
     # Use the updated function
-    combined_22 = join_datasets(ee_ds_22, cecil_22, time_method='first')
-    combined_24 = join_datasets(ee_ds_24, cecil_24, time_method='first')
+    combined_22 = join_datasets(
+        ee_ds_22, cecil_22, time_method='first',
+        store=join_store_dir / 'combined_22.zarr' if join_store_dir else None, **join_kwargs
+    )
+    combined_24 = join_datasets(
+        ee_ds_24, cecil_24, time_method='first',
+        store=join_store_dir / 'combined_24.zarr' if join_store_dir else None, **join_kwargs
+    )
 
     mo.vstack([
         mo.md("### Combined Dataset 2022-2023"),
@@ -240,7 +328,7 @@ def _(cecil_22, cecil_24, ee_ds_22, ee_ds_24, join_datasets, mo):
 
 
 @app.cell
-def _(np, pl):
+def _(pixel_areas, windowed_stats):
     def calculate_stats(combined_ds, period_label):
         """Calculate statistics from combined dataset"""
         # Remove time dimension from NDVI if it exists
@@ -252,71 +340,37 @@ def _(np, pl):
         # Also squeeze land_cover in case it has singleton dimensions
         lc_data = combined_ds['land_cover'].squeeze()
 
-        # Flatten arrays
-        ndvi_flat = ndvi_data.values.flatten()
-        lc_flat = lc_data.values.flatten()
-
-        # Ensure both arrays have the same length
-        if len(ndvi_flat) != len(lc_flat):
-            raise ValueError(f"Array length mismatch: NDVI={len(ndvi_flat)}, land_cover={len(lc_flat)}")
-
-        # Remove NaN values
-        mask = ~np.isnan(ndvi_flat) & ~np.isnan(lc_flat)
-
-        df = pl.DataFrame({
-            'ndvi': ndvi_flat[mask],
-            'land_cover': lc_flat[mask].astype(int),
-            'period': period_label
-        })
-
-        return df.group_by('land_cover').agg([
-            pl.col('ndvi').mean().alias('mean_ndvi'),
-            pl.col('ndvi').std().alias('std_ndvi'),
-            pl.len().alias('pixel_count')
-        ]).sort('land_cover')
+        # Per-class count, mean, M2 and a fixed-bin NDVI histogram, reduced window by
+        # window with np.bincount over uint8 codes and merged; memory stays
+        # O(window + classes * bins). Percentiles are read off the histogram.
+        # Pixels are weighted by their geodesic area (cached per grid), so means
+        # are area-weighted and area_ha is exact for EPSG:4326 pixels.
+        stats, histogram = windowed_stats(lc_data, ndvi_data, pixel_area=pixel_areas(ndvi_data))
+        summary = stats.to_frame(area=True).join(histogram.quantiles(), on='land_cover', how='left')
+        return summary, histogram.to_frame()
     return (calculate_stats,)
 
 
 @app.cell
 def _(calculate_stats, combined_22, combined_24):
-    stats_22 = calculate_stats(combined_22, '2022-2023')
-    stats_24 = calculate_stats(combined_24, '2024-2025')
-    return stats_22, stats_24
+    stats_22, hist_22 = calculate_stats(combined_22, '2022-2023')
+    stats_24, hist_24 = calculate_stats(combined_24, '2024-2025')
+    return hist_22, hist_24, stats_22, stats_24
 
 
 @app.cell
-def _(pl):
-    # Define Land Cover class names from Cecil documentation
+def _(LAND_COVER_9_CLASS):
+    # Land Cover class names come from the shared registry (src/utils/land_cover.py)
     # https://docs.cecil.earth/Land-Cover-9-Class-111ef16bbbe481c0bb41e6e79ec441c8
-    LAND_COVER_CLASSES = {
-        1: 'Water',
-        2: 'Trees',
-        3: 'Grass',
-        4: 'Flooded Vegetation',
-        5: 'Crops',
-        6: 'Scrub/Shrub',
-        7: 'Built Area',
-        8: 'Bare Ground',
-        9: 'Snow/Ice',
-        11: 'Clouds'
-    }
-
     def map_land_cover_names(df):
-        """Map land cover indices to class names using when-then chain"""
-        # Build the mapping expression
-        mapping_expr = pl.when(pl.col('land_cover') == 1).then(pl.lit('Water'))
-        for code, name in list(LAND_COVER_CLASSES.items())[1:]:
-            mapping_expr = mapping_expr.when(pl.col('land_cover') == code).then(pl.lit(name))
-        mapping_expr = mapping_expr.otherwise(pl.lit('Unknown'))
-
-        return df.with_columns(
-            mapping_expr.alias('land_cover_name')
-        ).select([
+        """Map land cover codes to class names with a single Enum lookup"""
+        return LAND_COVER_9_CLASS.label(df).select([
             'land_cover',
             'land_cover_name',
             'mean_ndvi',
             'std_ndvi',
-            'pixel_count'
+            'pixel_count',
+            'area_ha'
         ])
     return (map_land_cover_names,)
 
@@ -357,7 +411,8 @@ def _(alt, pl, stats_22_labeled, stats_24_labeled):
             alt.Tooltip('land_cover_name:N', title='Land Cover'),
             alt.Tooltip('Period:N', title='Period'),
             alt.Tooltip('mean_ndvi:Q', title='Mean NDVI', format='.4f'),
-            alt.Tooltip('pixel_count:Q', title='Pixel Count')
+            alt.Tooltip('pixel_count:Q', title='Pixel Count'),
+            alt.Tooltip('area_ha:Q', title='Area (ha)', format='.2f')
         ]
     ).properties(
         title='Mean NDVI by Land Cover Class: 2022-2023 vs 2024-2025',
@@ -369,6 +424,35 @@ def _(alt, pl, stats_22_labeled, stats_24_labeled):
     return (chart_comparison,)
 
 
+@app.cell
+def _(LAND_COVER_9_CLASS, alt, hist_22, hist_24, pl):
+    # Per-class NDVI distributions from the fixed-bin histograms (no extra EE calls)
+    hist_df = LAND_COVER_9_CLASS.label(pl.concat([
+        hist_22.with_columns(pl.lit("2022-2023").alias("Period")),
+        hist_24.with_columns(pl.lit("2024-2025").alias("Period"))
+    ]))
+
+    chart_distribution = alt.Chart(hist_df).mark_line(interpolate='step-after').encode(
+        x=alt.X('bin_start:Q', title='NDVI'),
+        y=alt.Y('pixel_count:Q', title='Pixel Count'),
+        color=alt.Color('Period:N', scale=alt.Scale(scheme='category10')),
+        facet=alt.Facet('land_cover_name:N', title='Land Cover Class', columns=3),
+        tooltip=[
+            alt.Tooltip('Period:N', title='Period'),
+            alt.Tooltip('bin_start:Q', title='NDVI from', format='.2f'),
+            alt.Tooltip('bin_end:Q', title='NDVI to', format='.2f'),
+            alt.Tooltip('pixel_count:Q', title='Pixel Count')
+        ]
+    ).properties(
+        title='NDVI Distribution by Land Cover Class',
+        width=200,
+        height=120
+    ).resolve_scale(y='independent')
+
+    chart_distribution
+    return (chart_distribution,)
+
+
 @app.cell
 def _(map_land_cover_names, mo, pl, stats_22, stats_24):
     # Calculate changes with labels
@@ -380,7 +464,7 @@ def _(map_land_cover_names, mo, pl, stats_22, stats_24):
 
         # Join the two dataframes on land_cover
         changes = stats_22_labeled.join(
-            stats_24_labeled.select(['land_cover', 'mean_ndvi', 'pixel_count']),
+            stats_24_labeled.select(['land_cover', 'mean_ndvi', 'pixel_count', 'area_ha']),
             on='land_cover',
             how='inner',
             suffix='_24'
@@ -389,7 +473,8 @@ def _(map_land_cover_names, mo, pl, stats_22, stats_24):
             (pl.col('mean_ndvi_24') - pl.col('mean_ndvi')).alias('ndvi_change'),
             ((pl.col('mean_ndvi_24') - pl.col('mean_ndvi')) / pl.col('mean_ndvi') * 100).alias('ndvi_pct_change'),
             (pl.col('pixel_count_24') - pl.col('pixel_count')).alias('area_change'),
-            ((pl.col('pixel_count_24') - pl.col('pixel_count')) / pl.col('pixel_count') * 100).alias('area_pct_change')
+            ((pl.col('pixel_count_24') - pl.col('pixel_count')) / pl.col('pixel_count') * 100).alias('area_pct_change'),
+            (pl.col('area_ha_24') - pl.col('area_ha')).alias('area_change_ha')
         ]).select([
             'land_cover',
             'land_cover_name',
@@ -400,7 +485,10 @@ def _(map_land_cover_names, mo, pl, stats_22, stats_24):
             'pixel_count',
             'pixel_count_24',
             'area_change',
-            'area_pct_change'
+            'area_pct_change',
+            'area_ha',
+            'area_ha_24',
+            'area_change_ha'
         ])
 
         return changes
@@ -414,29 +502,152 @@ def _(map_land_cover_names, mo, pl, stats_22, stats_24):
     return (changes_df,)
 
 
+@app.cell
+def _(
+    LAND_COVER_9_CLASS,
+    combined_22,
+    combined_24,
+    mo,
+    pixel_areas,
+    transition_matrix,
+):
+    # Land-cover transitions between periods (e.g. Trees -> Built Area), from one
+    # np.bincount over paired class codes, with the mean NDVI change per transition
+    def ndvi_2d(combined_ds):
+        ndvi = combined_ds['NDVI']
+        return (ndvi.isel(time=0) if 'time' in ndvi.dims else ndvi).squeeze()
+
+    transitions_df = transition_matrix(
+        combined_22['land_cover'].squeeze().values,
+        combined_24['land_cover'].squeeze().values,
+        ndvi_a=ndvi_2d(combined_22).values,
+        ndvi_b=ndvi_2d(combined_24).values,
+        pixel_area=pixel_areas(ndvi_2d(combined_22))
+    ).with_columns([
+        LAND_COVER_9_CLASS.name_expr('from_class').alias('from_class_name'),
+        LAND_COVER_9_CLASS.name_expr('to_class').alias('to_class_name')
+    ]).select([
+        'from_class',
+        'from_class_name',
+        'to_class',
+        'to_class_name',
+        'pixel_count',
+        'area_ha',
+        'mean_ndvi_change'
+    ]).sort('pixel_count', descending=True)
+
+    mo.vstack([
+        mo.md("### Land Cover Transitions (2022-2023 → 2024-2025)"),
+        transitions_df
+    ])
+    return ndvi_2d, transitions_df
+
+
+@app.cell
+def _(alt, combined_22, combined_24, detect_changes, mo, ndvi_2d, pixel_areas):
+    # Local NDVI change detection on the joined rasters: delta, change categories,
+    # area per category and histogram in one vectorized pass (no Earth Engine calls)
+    _ndvi_22 = ndvi_2d(combined_22)
+    change_summary = detect_changes(
+        _ndvi_22.values,
+        ndvi_2d(combined_24).values,
+        pixel_area=pixel_areas(_ndvi_22)
+    )
+    change_categories_df = change_summary.to_frame()
+
+    chart_change_histogram = alt.Chart(change_summary.histogram).mark_bar().encode(
+        x=alt.X('NDVI_Change:Q', title='NDVI Change', bin=alt.Bin(maxbins=100)),
+        y=alt.Y('Pixel_Count:Q', title='Pixel Count'),
+        tooltip=[
+            alt.Tooltip('NDVI_Change:Q', title='NDVI Change', format='.3f'),
+            alt.Tooltip('Pixel_Count:Q', title='Pixel Count')
+        ]
+    ).properties(
+        title='Distribution of NDVI Change (2022-2023 → 2024-2025)',
+        width=600,
+        height=300
+    )
+
+    mo.vstack([
+        mo.md(f"""
+        ### NDVI Change Detection (2022-2023 → 2024-2025)
+        **Mean change:** {change_summary.stats['mean']:.4f} ± {change_summary.stats['stdDev']:.4f}
+        (range {change_summary.stats['min']:.4f} to {change_summary.stats['max']:.4f})
+        """),
+        change_categories_df,
+        chart_change_histogram
+    ])
+    return change_categories_df, change_summary, chart_change_histogram
+
+
+@app.cell
+def _(
+    CONFIG,
+    LAND_COVER_9_CLASS,
+    change_summary,
+    combined_22,
+    find_hotspots,
+    hotspot_polygons,
+    mo,
+    ndvi_2d,
+    pixel_areas,
+):
+    # Change hotspots: connected patches of significant loss and gain, ranked by area,
+    # with mean NDVI change and the dominant 2022-2023 land-cover class of each patch
+    _grid = ndvi_2d(combined_22)
+    hotspot_labels, hotspots_df = find_hotspots(
+        change_summary.delta,
+        land_cover=combined_22['land_cover'].squeeze().values,
+        pixel_area=pixel_areas(_grid),
+        threshold=CONFIG['hotspot_threshold'],
+        min_pixels=CONFIG['hotspot_min_pixels']
+    )
+    hotspots_df = LAND_COVER_9_CLASS.label(hotspots_df, 'dominant_class')
+
+    hotspots_gdf = hotspot_polygons(hotspot_labels, hotspots_df, _grid.rio.transform(), _grid.rio.crs)
+
+    mo.vstack([
+        mo.md(f"""
+        ### Change Hotspots (|Δ NDVI| > {CONFIG['hotspot_threshold']})
+        **Patches:** {hotspots_df.height:,} ({CONFIG['hotspot_min_pixels']}+ pixels)
+        """),
+        hotspots_df.head(20)
+    ])
+    return hotspots_df, hotspots_gdf
+
+
 @app.cell
 def _(
     CONFIG,
     Path,
-    aoi_geometry,
+    aoi_summary,
+    change_categories_df,
+    change_summary,
     changes_df,
+    chart_change_histogram,
     chart_comparison,
+    chart_distribution,
     combined_22,
     combined_24,
     datetime,
+    hotspots_df,
+    hotspots_gdf,
     json,
     pystac,
     stats_22,
     stats_24,
+    transitions_df,
 ):
     # Output Generation
 
     output_dir = Path("outputs")
     reports_dir = output_dir / "reports"
     figures_dir = output_dir / "figures"
+    layers_dir = output_dir / "layers"
 
     reports_dir.mkdir(parents=True, exist_ok=True)
     figures_dir.mkdir(parents=True, exist_ok=True)
+    layers_dir.mkdir(parents=True, exist_ok=True)
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
@@ -447,6 +658,25 @@ def _(
     except Exception as e:
         print(f"Could not save chart: {e}")
 
+    distribution_path = figures_dir / f"ndvi_distribution_{timestamp}.png"
+    try:
+        chart_distribution.save(str(distribution_path))
+    except Exception as e:
+        print(f"Could not save chart: {e}")
+
+    change_histogram_path = figures_dir / f"ndvi_change_histogram_{timestamp}.png"
+    try:
+        chart_change_histogram.save(str(change_histogram_path))
+    except Exception as e:
+        print(f"Could not save chart: {e}")
+
+    # Hotspot patches as vector layers (GeoJSON for viewers, GeoParquet for analysis)
+    hotspots_geojson_path = layers_dir / f"ndvi_change_hotspots_{timestamp}.geojson"
+    hotspots_parquet_path = layers_dir / f"ndvi_change_hotspots_{timestamp}.parquet"
+    hotspots_gdf.to_crs("EPSG:4326").to_file(hotspots_geojson_path, driver="GeoJSON")
+    hotspots_gdf.to_parquet(hotspots_parquet_path)
+    print(f"Hotspot layers saved to: {hotspots_geojson_path}, {hotspots_parquet_path}")
+
     # 2. Report
     report_content = f"""# Temporal Geospatial Analysis Report
 
@@ -459,7 +689,7 @@ def _(
     ## Study Area
     **Location**: Colossus Supercomputer Site
     **Total Pixels**: {stats_22['pixel_count'].sum():,} (Period 1), {stats_24['pixel_count'].sum():,} (Period 2)
-    **Coverage Area**: ~{(stats_22['pixel_count'].sum() * (CONFIG['scale']/1000)**2):.2f} km²
+    **Coverage Area**: {stats_22['area_ha'].sum() / 100:.2f} km² (geodesic pixel areas)
 
 
     ## Methodology
@@ -479,7 +709,7 @@ def _(
     1. Temporal compositing using median values to reduce cloud interference
     2. NDVI calculation: (NIR - Red) / (NIR + Red)
     3. CRS reprojection from EPSG:3857 (Cecil) to EPSG:4326 (Earth Engine)
-    4. Statistical aggregation by land cover class
+    4. Statistical aggregation by land cover class (mean, standard deviation, percentiles)
 
     ## Results
 
@@ -492,7 +722,27 @@ def _(
     ### Change Analysis
     {changes_df.to_pandas().to_markdown(index=False) if changes_df is not None else "No Data"}
 
+    ### Land Cover Transitions
+    {transitions_df.to_pandas().to_markdown(index=False) if transitions_df is not None else "No Data"}
+
+    ### NDVI Change Categories
+    Mean pixel change: {change_summary.stats['mean']:.4f} ± {change_summary.stats['stdDev']:.4f}
+
+    {change_categories_df.to_pandas().to_markdown(index=False)}
+
+    ![NDVI Change Histogram](../figures/{change_histogram_path.name})
+
+    ### Change Hotspots
+    {hotspots_df.height:,} connected patches of significant change, largest 10 shown. Full layer: `{hotspots_geojson_path.name}`
+
+    {hotspots_df.head(10).to_pandas().to_markdown(index=False)}
+
     ![NDVI Comparison Chart](../figures/{chart_path.name})
+
+    ### NDVI Distribution
+    Percentiles (p5-p95) in the tables above are interpolated from per-class histograms with 0.01-wide NDVI bins.
+
+    ![NDVI Distribution Chart](../figures/{distribution_path.name})
     """
     report_path = reports_dir / f"final_report_{timestamp}.md"
     report_path.write_text(report_content)
@@ -506,12 +756,9 @@ def _(
         metadata_dir = Path("data/metadata")
         metadata_dir.mkdir(parents=True, exist_ok=True)
 
-        # Get Geometry and BBox
-        geom_info = aoi_geometry.getInfo()
-        bounds = aoi_geometry.bounds().getInfo()['coordinates'][0]
-        xs = [p[0] for p in bounds]
-        ys = [p[1] for p in bounds]
-        bbox = [min(xs), min(ys), max(xs), max(ys)]
+        # Geometry and BBox of all AOI features, computed locally from the GeoJSON
+        geom_info = aoi_summary.geometry
+        bbox = aoi_summary.bbox
 
         item_id = f"combined-analysis-{period_label}-{timestamp}"
         stac_item = pystac.Item(
@@ -531,6 +778,11 @@ def _(
             key="report",
             asset=pystac.Asset(href=str(report_path), media_type="text/markdown", title="Analysis Report")
         )
+        stac_item.add_asset(
+            key="hotspots",
+            asset=pystac.Asset(href=str(hotspots_parquet_path), media_type="application/vnd.apache.parquet",
+                               title="NDVI Change Hotspots")
+        )
         stac_path = metadata_dir / f"combined_analysis_{period_label}.json"
 
         with open(stac_path, 'w') as f_stac:
@@ -38,6 +38,22 @@ def _():
     return (alt,)
 
 
+@app.cell
+def _():
+    from src.utils.change_detection import change_category_colors, change_category_labels
+    from src.utils.ee_batch import get_info_batch
+    from src.utils.ee_stats import category_areas, change_category_reduction
+    from src.utils.geometry import geometry_summary
+    return (
+        category_areas,
+        change_category_colors,
+        change_category_labels,
+        change_category_reduction,
+        geometry_summary,
+        get_info_batch,
+    )
+
+
 @app.cell
 def _(load_dotenv):
     load_dotenv()
@@ -65,6 +81,9 @@ def _(os):
         'satellite': 'COPERNICUS/S2_SR_HARMONIZED',
         'scale': 10,  # meters per pixel for Sentinel-2
         'max_pixels': 1e8,  # Maximum pixels for export/computation
+        'change_thresholds': (-0.2, -0.1, 0.1, 0.2),  # NDVI change category boundaries
+        # One name per category, i.e. len(change_thresholds) + 1
+        'change_category_names': ('Strong Loss', 'Moderate Loss', 'No Change', 'Moderate Gain', 'Strong Gain'),
         'vis_params': {
             'min': 0,
             'max': 3000,
@@ -111,9 +130,12 @@ def _(CONFIG, json):
 
 
 @app.cell
-def _(ee, expanded_geojson_data):
+def _(ee, expanded_geojson_data, geometry_summary):
     aoi_geometry_104ha = ee.FeatureCollection(expanded_geojson_data['features']).geometry()
-    return (aoi_geometry_104ha,)
+
+    # Area, bbox and centroid of all AOI features, computed locally (no getInfo)
+    aoi_summary = geometry_summary(expanded_geojson_data)
+    return aoi_geometry_104ha, aoi_summary
 
 
 @app.cell
@@ -126,10 +148,8 @@ def _(CONFIG, aoi_geometry_104ha, ee):
 
 
 @app.cell
-def _(CONFIG, aoi_geometry_104ha):
-    # Use bounded operation to avoid memory issues with large geometries
-    centroid_info = aoi_geometry_104ha.centroid(maxError=CONFIG['scale']).getInfo()
-    print(f"Expanded AOI successfully loaded. Center: {centroid_info['coordinates']}")
+def _(aoi_summary):
+    print(f"Expanded AOI successfully loaded. Center: {aoi_summary.centroid}")
     return
 
 
@@ -213,7 +233,7 @@ def _(mo):
 
 
 @app.cell
-def _(CONFIG, L8_collection, aoi_geometry_104ha, ee, mo):
+def _(CONFIG, L8_collection, aoi_geometry_104ha, ee, get_info_batch, mo):
     # Create the 2024-2025 collection
     L8_collection_2024 = (ee.ImageCollection(CONFIG['satellite'])
         .filterDate('2024-01-01', '2025-01-01')
@@ -223,9 +243,13 @@ def _(CONFIG, L8_collection, aoi_geometry_104ha, ee, mo):
     # Create median composite
     median_composite_2024 = L8_collection_2024.median().clip(aoi_geometry_104ha)
 
-    # Check how many images were used
-    image_count_2022 = L8_collection.size().getInfo()
-    image_count_2024 = L8_collection_2024.size().getInfo()
+    # Check how many images were used (both counts in one batched getInfo)
+    image_counts = get_info_batch({
+        '2022': L8_collection.size(),
+        '2024': L8_collection_2024.size()
+    })
+    image_count_2022 = image_counts['2022']
+    image_count_2024 = image_counts['2024']
 
     mo.md(f"""
     ### Image Collection Summary
@@ -307,41 +331,53 @@ def _(
 
 
 @app.cell
-def _(CONFIG, aoi_geometry_104ha, ee, ndvi_2022, ndvi_2024, ndvi_change, pl):
-    # Calculate statistics for both periods
-    stats_2022 = ndvi_2022.reduceRegion(
-        reducer=ee.Reducer.mean().combine(
-            ee.Reducer.stdDev(), '', True
-        ).combine(
-            ee.Reducer.minMax(), '', True
-        ),
-        geometry=aoi_geometry_104ha,
-        scale=CONFIG['scale'],
-        maxPixels=CONFIG['max_pixels']
-    ).getInfo()
-
-    stats_2024 = ndvi_2024.reduceRegion(
-        reducer=ee.Reducer.mean().combine(
-            ee.Reducer.stdDev(), '', True
-        ).combine(
-            ee.Reducer.minMax(), '', True
-        ),
-        geometry=aoi_geometry_104ha,
-        scale=CONFIG['scale'],
-        maxPixels=CONFIG['max_pixels']
-    ).getInfo()
-
-    # Calculate change statistics
-    change_stats = ndvi_change.reduceRegion(
-        reducer=ee.Reducer.mean().combine(
-            ee.Reducer.stdDev(), '', True
-        ).combine(
-            ee.Reducer.minMax(), '', True
-        ),
-        geometry=aoi_geometry_104ha,
-        scale=CONFIG['scale'],
-        maxPixels=CONFIG['max_pixels']
-    ).getInfo()
+def _(
+    CONFIG,
+    aoi_geometry_104ha,
+    change_category_reduction,
+    ee,
+    get_info_batch,
+    ndvi_2022,
+    ndvi_2024,
+    ndvi_change,
+):
+    # Every summary number below is requested here and resolved with one batched getInfo
+    _summary_reducer = ee.Reducer.mean().combine(
+        ee.Reducer.stdDev(), '', True
+    ).combine(
+        ee.Reducer.minMax(), '', True
+    )
+
+    def _reduce_region(image, reducer):
+        return image.reduceRegion(
+            reducer=reducer,
+            geometry=aoi_geometry_104ha,
+            scale=CONFIG['scale'],
+            maxPixels=CONFIG['max_pixels']
+        )
+
+    ee_results = get_info_batch({
+        'stats_2022': _reduce_region(ndvi_2022, _summary_reducer),
+        'stats_2024': _reduce_region(ndvi_2024, _summary_reducer),
+        'change_stats': _reduce_region(ndvi_change, _summary_reducer),
+        'change_histogram': _reduce_region(ndvi_change, ee.Reducer.histogram(maxBuckets=100)),
+        'change_categories': change_category_reduction(
+            ndvi_change,
+            geometry=aoi_geometry_104ha,
+            scale=CONFIG['scale'],
+            max_pixels=CONFIG['max_pixels'],
+            thresholds=CONFIG['change_thresholds']
+        )
+    })
+    return (ee_results,)
+
+
+@app.cell
+def _(ee_results, pl):
+    # Statistics for both periods and for the change
+    stats_2022 = ee_results['stats_2022']
+    stats_2024 = ee_results['stats_2024']
+    change_stats = ee_results['change_stats']
 
     # Create comparison dataframe
     comparison_df = pl.DataFrame({
@@ -367,14 +403,9 @@ def _(CONFIG, aoi_geometry_104ha, ee, ndvi_2022, ndvi_2024, ndvi_change, pl):
 
 
 @app.cell
-def _(CONFIG, alt, aoi_geometry_104ha, ee, ndvi_change, pl):
-    # Calculate histogram of changes
-    change_histogram = ndvi_change.reduceRegion(
-        reducer=ee.Reducer.histogram(maxBuckets=100),
-        geometry=aoi_geometry_104ha,
-        scale=CONFIG['scale'],
-        maxPixels=CONFIG['max_pixels']
-    ).getInfo()
+def _(alt, ee_results, pl):
+    # Histogram of changes (fetched in the batched request above)
+    change_histogram = ee_results['change_histogram']
 
     # Extract histogram data
     hist_data = change_histogram['NDVI_Change']
@@ -406,69 +437,26 @@ def _(CONFIG, alt, aoi_geometry_104ha, ee, ndvi_change, pl):
 
 
 @app.cell
-def _(CONFIG, alt, aoi_geometry_104ha, ee, mo, ndvi_change, pl):
-
-    # Define change categories
-    vegetation_loss_strong = ndvi_change.lt(-0.2)
-    vegetation_loss_moderate = ndvi_change.gte(-0.2).And(ndvi_change.lt(-0.1))
-    no_change = ndvi_change.gte(-0.1).And(ndvi_change.lte(0.1))
-    vegetation_gain_moderate = ndvi_change.gt(0.1).And(ndvi_change.lte(0.2))
-    vegetation_gain_strong = ndvi_change.gt(0.2)
-
-    # Calculate area for each category (in square meters)
-    pixel_area = ee.Image.pixelArea()
-
-    area_loss_strong = vegetation_loss_strong.multiply(pixel_area).reduceRegion(
-        reducer=ee.Reducer.sum(),
-        geometry=aoi_geometry_104ha,
-        scale=CONFIG['scale'],
-        maxPixels=CONFIG['max_pixels']
-    ).getInfo()
-
-    area_loss_moderate = vegetation_loss_moderate.multiply(pixel_area).reduceRegion(
-        reducer=ee.Reducer.sum(),
-        geometry=aoi_geometry_104ha,
-        scale=CONFIG['scale'],
-        maxPixels=CONFIG['max_pixels']
-    ).getInfo()
-
-    area_no_change = no_change.multiply(pixel_area).reduceRegion(
-        reducer=ee.Reducer.sum(),
-        geometry=aoi_geometry_104ha,
-        scale=CONFIG['scale'],
-        maxPixels=CONFIG['max_pixels']
-    ).getInfo()
-
-    area_gain_moderate = vegetation_gain_moderate.multiply(pixel_area).reduceRegion(
-        reducer=ee.Reducer.sum(),
-        geometry=aoi_geometry_104ha,
-        scale=CONFIG['scale'],
-        maxPixels=CONFIG['max_pixels']
-    ).getInfo()
-
-    area_gain_strong = vegetation_gain_strong.multiply(pixel_area).reduceRegion(
-        reducer=ee.Reducer.sum(),
-        geometry=aoi_geometry_104ha,
-        scale=CONFIG['scale'],
-        maxPixels=CONFIG['max_pixels']
-    ).getInfo()
+def _(
+    CONFIG,
+    alt,
+    category_areas,
+    change_category_colors,
+    change_category_labels,
+    ee_results,
+    mo,
+    pl,
+):
+    # Area per change category, from one grouped pixelArea sum in the batched request
+    category_labels = change_category_labels(CONFIG['change_thresholds'], CONFIG['change_category_names'])
+    category_areas_m2 = dict(zip(category_labels, category_areas(
+        ee_results['change_categories'], len(category_labels)
+    )))
 
     # Create summary dataframe (convert to hectares)
     category_df = pl.DataFrame({
-        'Category': [
-            'Strong Loss (Δ < -0.2)',
-            'Moderate Loss (-0.2 ≤ Δ < -0.1)',
-            'No Change (-0.1 ≤ Δ ≤ 0.1)',
-            'Moderate Gain (0.1 < Δ ≤ 0.2)',
-            'Strong Gain (Δ > 0.2)'
-        ],
-        'Area_ha': [
-            area_loss_strong.get('NDVI_Change', 0) / 10000,
-            area_loss_moderate.get('NDVI_Change', 0) / 10000,
-            area_no_change.get('NDVI_Change', 0) / 10000,
-            area_gain_moderate.get('NDVI_Change', 0) / 10000,
-            area_gain_strong.get('NDVI_Change', 0) / 10000
-        ]
+        'Category': category_labels,
+        'Area_ha': [area / 10000 for area in category_areas_m2.values()]
     })
 
     # Create pie chart
@@ -476,10 +464,8 @@ def _(CONFIG, alt, aoi_geometry_104ha, ee, mo, ndvi_change, pl):
         theta=alt.Theta('Area_ha:Q', title='Area (hectares)'),
         color=alt.Color('Category:N', 
             scale=alt.Scale(
-                domain=['Strong Loss (Δ < -0.2)', 'Moderate Loss (-0.2 ≤ Δ < -0.1)', 
-                       'No Change (-0.1 ≤ Δ ≤ 0.1)', 'Moderate Gain (0.1 < Δ ≤ 0.2)', 
-                       'Strong Gain (Δ > 0.2)'],
-                range=['darkred', 'red', 'gray', 'lightgreen', 'darkgreen']
+                domain=category_labels,
+                range=change_category_colors(CONFIG['change_thresholds'])
             )
         ),
         tooltip=['Category:N', alt.Tooltip('Area_ha:Q', format='.2f', title='Area (ha)')]
@@ -490,13 +476,7 @@ def _(CONFIG, alt, aoi_geometry_104ha, ee, mo, ndvi_change, pl):
     )
 
     mo.vstack([category_df, pie_chart])
-    return (
-        area_gain_moderate,
-        area_gain_strong,
-        area_loss_moderate,
-        area_loss_strong,
-        area_no_change,
-    )
+    return (category_areas_m2,)
 
 
 @app.cell
@@ -536,24 +516,17 @@ def _(
 
 
 @app.cell
-def _(
-    aoi_geometry_104ha,
-    area_gain_moderate,
-    area_gain_strong,
-    area_loss_moderate,
-    area_loss_strong,
-    area_no_change,
-    change_stats,
-    mo,
-):
+def _(CONFIG, aoi_summary, category_areas_m2, change_stats, mo):
 
 
-    total_area = aoi_geometry_104ha.area().divide(10000).getInfo()  # in hectares
+    total_area = aoi_summary.area_ha  # geodesic, computed locally
 
-    vegetation_loss_area = (area_loss_strong.get('NDVI_Change', 0) + 
-                           area_loss_moderate.get('NDVI_Change', 0)) / 10000
-    vegetation_gain_area = (area_gain_strong.get('NDVI_Change', 0) + 
-                           area_gain_moderate.get('NDVI_Change', 0)) / 10000
+    # Categories run from strongest loss to strongest gain; the one containing 0 is "no change"
+    category_area_values = list(category_areas_m2.values())
+    no_change_index = sum(1 for t in CONFIG['change_thresholds'] if t <= 0)
+    area_no_change = category_area_values[no_change_index]
+    vegetation_loss_area = sum(category_area_values[:no_change_index]) / 10000
+    vegetation_gain_area = sum(category_area_values[no_change_index + 1:]) / 10000
 
     net_change_pct = ((vegetation_gain_area - vegetation_loss_area) / total_area) * 100
 
@@ -568,7 +541,7 @@ def _(
     ### Area Changes
     - **Vegetation Loss**: {vegetation_loss_area:.2f} ha ({(vegetation_loss_area/total_area*100):.1f}%)
     - **Vegetation Gain**: {vegetation_gain_area:.2f} ha ({(vegetation_gain_area/total_area*100):.1f}%)
-    - **No Significant Change**: {area_no_change.get('NDVI_Change', 0)/10000:.2f} ha
+    - **No Significant Change**: {area_no_change/10000:.2f} ha
 
     ### Interpretation
     - **Positive change** indicates vegetation increase (greening)
@@ -0,0 +1,179 @@
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import cecil
+import xarray as xr
+
+# Zarr attributes used to record where and when a store was fetched
+FETCHED_AT_ATTR = 'cecil_cache:fetched_at'
+SUBSCRIPTION_ATTR = 'cecil_cache:subscription_id'
+
+DEFAULT_MAX_AGE = timedelta(days=7)
+
+
+class CachedCecilClient:
+    """
+    Wrap a `cecil.Client` so `load_xarray` results persist in local Zarr stores.
+
+    Each subscription is written once to `<cache_dir>/<subscription_id>.zarr`,
+    chunked one time step per chunk, and reopened lazily on later calls. Time
+    windows selected with `.sel(time=slice(...))` therefore only read the
+    matching steps from local disk. A store older than `max_age` (per its
+    fetch timestamp) is fetched again. Any other attribute is forwarded to the
+    wrapped client.
+
+    Parameters
+    ==========
+    client: cecil.Client, optional
+        The client to wrap; a new one is created when omitted.
+    cache_dir: str | Path
+        Directory holding the Zarr stores.
+    max_age: timedelta, optional
+        How long a stored subscription stays fresh; None never expires.
+    """
+
+    def __init__(self, client: Optional[cecil.Client] = None,
+                 cache_dir: Union[str, Path] = 'data/cache/cecil',
+                 max_age: Optional[timedelta] = DEFAULT_MAX_AGE):
+        self.client = client if client is not None else cecil.Client()
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+
+    def __getattr__(self, name):
+        if name == 'client':
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def store_path(self, subscription_id: str) -> Path:
+        return self.cache_dir / f"{subscription_id}.zarr"
+
+    def is_fresh(self, subscription_id: str) -> bool:
+        """
+        Check whether a complete, unexpired store exists for the subscription.
+        """
+        store = self.store_path(subscription_id)
+        if not store.exists():
+            return False
+        try:
+            attrs = xr.open_zarr(store).attrs
+        except Exception:
+            return False
+
+        fetched_at = attrs.get(FETCHED_AT_ATTR)
+        if fetched_at is None or attrs.get(SUBSCRIPTION_ATTR) != subscription_id:
+            return False
+        if self.max_age is None:
+            return True
+        return datetime.now(timezone.utc) - datetime.fromisoformat(fetched_at) < self.max_age
+
+    def load_xarray(self, subscription_id: str, refresh: bool = False) -> xr.Dataset:
+        """
+        Load a subscription's dataset, fetching from Cecil only on a cache miss.
+
+        Parameters
+        ==========
+        subscription_id: str
+            The Cecil Subscription to load.
+        refresh: bool
+            Ignore any stored copy and fetch again.
+
+        Returns
+        =======
+        xr.Dataset
+            The subscription dataset, lazily backed by the local Zarr store.
+        """
+        store = self.store_path(subscription_id)
+        if refresh or not self.is_fresh(subscription_id):
+            ds = self.client.load_xarray(subscription_id=subscription_id)
+            self._write_store(ds, subscription_id, store)
+        return xr.open_zarr(store)
+
+    def invalidate(self, subscription_id: Optional[str] = None):
+        """
+        Delete the store for `subscription_id`, or every store when it is None.
+        """
+        stores = [self.store_path(subscription_id)] if subscription_id else self.cache_dir.glob('*.zarr')
+        for store in stores:
+            shutil.rmtree(store, ignore_errors=True)
+
+    def _write_store(self, ds: xr.Dataset, subscription_id: str, store: Path):
+        ds = ds.copy()
+        # Source encodings (compressors, chunk sizes) do not carry over to Zarr cleanly
+        for name in ds.variables:
+            ds[name].encoding = {}
+        if 'time' in ds.dims:
+            ds = ds.chunk({'time': 1})
+        ds.attrs[FETCHED_AT_ATTR] = datetime.now(timezone.utc).isoformat()
+        ds.attrs[SUBSCRIPTION_ATTR] = subscription_id
+
+        # Write next to the final location and swap in, so readers never see a partial store.
+        # The temporary name is unique, so concurrent loads of one subscription never share it.
+        tmp_store = Path(tempfile.mkdtemp(prefix=f"{store.name}.", suffix='.partial', dir=store.parent))
+        try:
+            ds.to_zarr(tmp_store, mode='w')
+            shutil.rmtree(store, ignore_errors=True)
+            try:
+                tmp_store.rename(store)
+            except OSError:
+                # Another writer swapped in its copy of the same subscription first
+                if not store.exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp_store, ignore_errors=True)
+
+
+def load_subscriptions(client, subscriptions: List[Dict],
+                       max_workers: int = 4) -> Tuple[Dict[str, xr.Dataset], List[Dict]]:
+    """
+    Load several Cecil subscriptions concurrently through a bounded worker pool.
+
+    Parameters
+    ==========
+    client: cecil.Client | CachedCecilClient
+        Client used for `load_xarray`.
+    subscriptions: list[dict]
+        Parsed subscriptions, as stored in `data/processed/cecil_subscriptions.json`.
+    max_workers: int
+        Upper bound on the number of simultaneous loads.
+
+    Returns
+    =======
+    tuple[dict[str, xr.Dataset], list[dict]]
+        Mapping of subscription name to its dataset (successful loads only), and
+        one summary per subscription with its load time in seconds and any error.
+    """
+    def load(sub: Dict) -> Tuple[Optional[xr.Dataset], Dict]:
+        summary = {
+            "name": sub.get("name", "Unknown"),
+            "id": sub["id"],
+            "dataset_id": sub.get("dataset_id"),
+            "error": None
+        }
+        start = time.perf_counter()
+        ds = None
+        try:
+            ds = client.load_xarray(subscription_id=sub["id"])
+            summary.update({
+                "dims": dict(ds.sizes),
+                "data_vars": list(ds.data_vars.keys()),
+                "coords": list(ds.coords.keys())
+            })
+        except Exception as e:
+            summary["error"] = str(e)
+        summary["seconds"] = time.perf_counter() - start
+        return ds, summary
+
+    if not subscriptions:
+        return {}, []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(subscriptions))) as executor:
+        results = list(executor.map(load, subscriptions))
+
+    datasets = {summary["name"]: ds for ds, summary in results if ds is not None}
+    return datasets, [summary for _, summary in results]
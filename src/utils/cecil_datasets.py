@@ -2,11 +2,24 @@ import cecil
 from dotenv import load_dotenv
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict
 
+try:
+    from src.utils.geometry import geometry_hash
+except ImportError:
+    # Run directly as `python src/utils/cecil_datasets.py`
+    from geometry import geometry_hash
+
 load_dotenv()
 
+# External reference used to tag (and later find) the project's AOI in Cecil;
+# a hash of the geometry is appended, see `aoi_external_ref`
+AOI_EXTERNAL_REF = "Colossus Data Center"
+
+SUBSCRIPTIONS_PATH = Path("data/processed/cecil_subscriptions.json")
+
 # Dictionary mapping Dataset Name to Cecil Dataset ID
 CECIL_DATASETS = {
     "Land Cover 9-Class": "a4bb9aea-b6df-4d19-9083-38357f8fa76c",
@@ -35,9 +48,13 @@ def parse_subscription(subscription) -> Dict:
         "aoi_id": subscription.aoi_id
     }
 
-def create_subscriptions(client: cecil.Client, aoi_id: str) -> List[Dict]:
+def create_subscriptions(client: cecil.Client, aoi_id: str, max_workers: int = 4) -> List[Dict]:
     """
-    Create Cecil Subscriptions for the given AOI and save them to a JSON file.
+    Ensure a Cecil Subscription exists for every dataset in CECIL_DATASETS on the given AOI.
+
+    Existing subscriptions are matched by AOI, dataset and `external_ref`
+    (the dataset name) and reused; only the missing ones are created,
+    concurrently. Running this again therefore creates nothing new.
 
     Parameters
     ==========
@@ -45,21 +62,86 @@ def create_subscriptions(client: cecil.Client, aoi_id: str) -> List[Dict]:
         The Cecil Client to use for creating the Subscriptions.
     aoi_id: str
         The ID of the AOI to create Subscriptions for.
+    max_workers: int
+        Upper bound on the number of simultaneous create requests.
 
     Returns
     =======
     list[dict]
-        The list of Cecil Subscriptions created.
+        The list of Cecil Subscriptions, existing and newly created.
     """
-    subscriptions = []
+    existing = {
+        (sub.dataset_id, sub.external_ref): sub
+        for sub in client.list_subscriptions()
+        if sub.aoi_id == aoi_id
+    }
+
+    subscriptions = {}
+    missing = []
     for dataset_name, dataset_id in CECIL_DATASETS.items():
-        subscription = client.create_subscription(
+        subscription = existing.get((dataset_id, dataset_name))
+        if subscription is not None:
+            print(f"Reusing subscription '{dataset_name}': {subscription.id}")
+            subscriptions[dataset_name] = parse_subscription(subscription)
+        else:
+            missing.append((dataset_name, dataset_id))
+
+    def create(item):
+        dataset_name, dataset_id = item
+        return client.create_subscription(
             aoi_id=aoi_id,
             dataset_id=dataset_id,
             external_ref=dataset_name
         )
-        subscriptions.append(parse_subscription(subscription))
-    return subscriptions
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+            for (dataset_name, _), subscription in zip(missing, executor.map(create, missing)):
+                print(f"Created subscription '{dataset_name}': {subscription.id}")
+                subscriptions[dataset_name] = parse_subscription(subscription)
+
+    # Keep the CECIL_DATASETS order in the output
+    return [subscriptions[name] for name in CECIL_DATASETS]
+
+def aoi_external_ref(geometry: dict) -> str:
+    """
+    External reference for the project's AOI, e.g. 'Colossus Data Center #1a2b3c4d5e6f'.
+
+    The suffix is a short hash of the geometry's coordinates, so an edited
+    AOI gets a new reference and is never matched to the stale one.
+
+    Parameters
+    ==========
+    geometry: dict
+        The geometry of the AOI in GeoJSON format.
+
+    Returns
+    =======
+    str
+        The external reference to create and look up the AOI with.
+    """
+    return f"{AOI_EXTERNAL_REF} #{geometry_hash(geometry)[:12]}"
+
+def find_aoi(client: cecil.Client, external_ref: str):
+    """
+    Look up an existing, non-archived AOI by its external reference.
+
+    Parameters
+    ==========
+    client: cecil.Client
+        The Cecil Client to query.
+    external_ref: str
+        The external reference the AOI was created with, see `aoi_external_ref`.
+
+    Returns
+    =======
+    cecil.AOI or None
+        The most recently created matching AOI, if any.
+    """
+    matches = [aoi for aoi in client.list_aois() if aoi.external_ref == external_ref]
+    if not matches:
+        return None
+    return max(matches, key=lambda aoi: aoi.created_at)
 
 def create_aoi(client: cecil.Client, geometry: dict):
     """
@@ -75,38 +157,78 @@ def create_aoi(client: cecil.Client, geometry: dict):
     Returns
     =======
     cecil.AOI
-        The created AOI.
+        The created AOI, tagged with `aoi_external_ref(geometry)`.
     """
     aoi = client.create_aoi(
-        external_ref="Colossus Data Center",
+        external_ref=aoi_external_ref(geometry),
         geometry=geometry
     )
     return aoi
 
+def get_or_create_aoi(client: cecil.Client, geometry: dict):
+    """
+    Reuse the project's AOI if it already exists in Cecil, otherwise create it.
+
+    An AOI is only reused when it was created from the same geometry (its
+    external reference carries a hash of the coordinates).
 
-def save_subscriptions(subscriptions: List[Dict]):
+    Parameters
+    ==========
+    client: cecil.Client
+        The Cecil Client to use.
+    geometry: dict
+        The geometry of the AOI in GeoJSON format.
+
+    Returns
+    =======
+    cecil.AOI
+        The existing or newly created AOI.
     """
-    Save a list of Cecil Subscriptions to a JSON file.
+    external_ref = aoi_external_ref(geometry)
+    aoi = find_aoi(client, external_ref)
+    if aoi is not None:
+        print(f"Reusing AOI '{external_ref}': {aoi.id}")
+        return aoi
+    aoi = create_aoi(client, geometry)
+    print(f"Created AOI '{external_ref}': {aoi.id}")
+    return aoi
+
+
+def save_subscriptions(subscriptions: List[Dict], path: Path = SUBSCRIPTIONS_PATH):
+    """
+    Merge a list of Cecil Subscriptions into the JSON file.
+
+    Entries already in the file are kept; entries with the same `id` are
+    updated in place and new ones are appended.
 
     Parameters
     ==========
     subscriptions: list[dict]
         The list of Cecil Subscriptions to save.
+    path: Path
+        The JSON file to merge into.
     """
-    with open("data/processed/cecil_subscriptions.json", "w") as f:
-        json.dump(subscriptions, f, indent=4)
+    merged = {}
+    if path.exists():
+        with open(path) as f:
+            merged = {sub["id"]: sub for sub in json.load(f)}
+    for sub in subscriptions:
+        merged[sub["id"]] = sub
+
+    with open(path, "w") as f:
+        json.dump(list(merged.values()), f, indent=4)
 
 def main():
     # Set Up Cecil Client
     client = cecil.Client()
     
-    # Create AOI
+    # Find or create AOI
     with open("data/colossus.json") as f:
         colossus_geojson = json.load(f)
     colossus_geometry = colossus_geojson.get("features")[0].get("geometry")
-    aoi = create_aoi(client, colossus_geometry)
+    aoi = get_or_create_aoi(client, colossus_geometry)
     
-    # Create Subscriptions
+    # Find or create Subscriptions
     subscriptions = create_subscriptions(client, aoi.id)
     
     # Save Subscriptions
@@ -0,0 +1,222 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+import polars as pl
+
+from src.utils.pixel_area import SQUARE_METERS_PER_HECTARE
+
+# NDVI change thresholds splitting strong/moderate loss, no change and moderate/strong gain
+CHANGE_THRESHOLDS = (-0.2, -0.1, 0.1, 0.2)
+CHANGE_CATEGORY_NAMES = ('Strong Loss', 'Moderate Loss', 'No Change', 'Moderate Gain', 'Strong Gain')
+
+
+def _format(threshold: float) -> str:
+    return f"{threshold:g}"
+
+
+def change_category_labels(thresholds: Sequence[float] = CHANGE_THRESHOLDS,
+                           names: Sequence[str] = CHANGE_CATEGORY_NAMES) -> List[str]:
+    """
+    Human-readable label for each change category, e.g. 'Moderate Loss (-0.2 ≤ Δ < -0.1)'.
+
+    Category k holds changes between thresholds k-1 and k. A change exactly on
+    a threshold at or below zero goes to the higher category and one above
+    zero to the lower, so the band around zero includes both of its bounds.
+
+    Parameters
+    ==========
+    thresholds: sequence of float
+        Increasing category boundaries.
+    names: sequence of str
+        One name per category (len(thresholds) + 1).
+
+    Returns
+    =======
+    list[str]
+        Labels in category order.
+    """
+    if len(names) != len(thresholds) + 1:
+        raise ValueError(f"Expected {len(thresholds) + 1} category names, got {len(names)}")
+
+    def lower(t):
+        return f"{_format(t)} ≤ Δ" if t <= 0 else f"{_format(t)} < Δ"
+
+    def upper(t):
+        return f"Δ < {_format(t)}" if t <= 0 else f"Δ ≤ {_format(t)}"
+
+    intervals = [upper(thresholds[0])]
+    for low, high in zip(thresholds[:-1], thresholds[1:]):
+        intervals.append(f"{lower(low)} {upper(high)[2:]}")
+    last = thresholds[-1]
+    intervals.append(f"Δ ≥ {_format(last)}" if last <= 0 else f"Δ > {_format(last)}")
+
+    return [f"{name} ({interval})" for name, interval in zip(names, intervals)]
+
+
+# Colour ramps for loss (strongest first) and gain (weakest first) categories
+LOSS_COLORS = ('#8b0000', '#ff0000')    # darkred -> red
+GAIN_COLORS = ('#90ee90', '#006400')    # lightgreen -> darkgreen
+NO_CHANGE_COLOR = '#808080'             # gray
+
+
+def _ramp(start: str, end: str, n: int) -> List[str]:
+    # n evenly spaced hex colours from start to end (the midpoint when n == 1)
+    if n == 0:
+        return []
+    a = np.array([int(start[i:i + 2], 16) for i in (1, 3, 5)], dtype=np.float64)
+    b = np.array([int(end[i:i + 2], 16) for i in (1, 3, 5)], dtype=np.float64)
+    steps = np.linspace(0, 1, n) if n > 1 else np.array([0.5])
+    return ['#' + ''.join(f"{round(c):02x}" for c in a + (b - a) * t) for t in steps]
+
+
+def change_category_colors(thresholds: Sequence[float] = CHANGE_THRESHOLDS) -> List[str]:
+    """
+    Chart colour for each change category: reds for loss, gray for no change, greens for gain.
+
+    The category holding zero change is the one after every threshold at or
+    below zero (see `change_category_labels`); categories before it are
+    shaded darkred to red and categories after it lightgreen to darkgreen.
+
+    Parameters
+    ==========
+    thresholds: sequence of float
+        Increasing category boundaries.
+
+    Returns
+    =======
+    list[str]
+        Hex colours in category order (len(thresholds) + 1).
+    """
+    no_change = sum(1 for t in thresholds if t <= 0)
+    n_gain = len(thresholds) - no_change
+    return _ramp(*LOSS_COLORS, no_change) + [NO_CHANGE_COLOR] + _ramp(*GAIN_COLORS, n_gain)
+
+
+def classify_change_array(delta: np.ndarray,
+                          thresholds: Sequence[float] = CHANGE_THRESHOLDS,
+                          nodata: int = 255) -> np.ndarray:
+    """
+    Local counterpart of `ee_stats.classify_change`: uint8 category per pixel.
+
+    Parameters
+    ==========
+    delta: np.ndarray
+        NDVI difference; NaN marks missing pixels.
+    thresholds: sequence of float
+        Increasing category boundaries.
+    nodata: int
+        Category written for missing pixels.
+
+    Returns
+    =======
+    np.ndarray
+        uint8 categories 0..len(thresholds), `nodata` where `delta` is NaN.
+    """
+    category = np.zeros(delta.shape, dtype=np.uint8)
+    for t in thresholds:
+        category += (delta >= t) if t <= 0 else (delta > t)
+    category[np.isnan(delta)] = nodata
+    return category
+
+
+class ChangeSummary:
+    """
+    Pixel-level NDVI change between two aligned rasters.
+
+    Attributes
+    ==========
+    delta: np.ndarray
+        float32 NDVI difference (later minus earlier), NaN where either is missing.
+    category: np.ndarray
+        uint8 change category per pixel (255 = missing).
+    labels: list[str]
+        Category labels, see `change_category_labels`.
+    areas_m2: np.ndarray
+        Area per category in square metres.
+    stats: dict
+        Mean, stdDev, min and max of the valid changes.
+    histogram: pl.DataFrame
+        Bucket means and pixel counts of the changes.
+    """
+
+    def __init__(self, delta, category, labels, areas_m2, stats, histogram):
+        self.delta = delta
+        self.category = category
+        self.labels = labels
+        self.areas_m2 = areas_m2
+        self.stats = stats
+        self.histogram = histogram
+
+    def to_frame(self) -> pl.DataFrame:
+        """Category, Area_ha table in category order."""
+        return pl.DataFrame({
+            'Category': self.labels,
+            'Area_ha': self.areas_m2 / SQUARE_METERS_PER_HECTARE
+        })
+
+
+def detect_changes(ndvi_a: np.ndarray, ndvi_b: np.ndarray,
+                   pixel_area: Optional[np.ndarray] = None,
+                   thresholds: Sequence[float] = CHANGE_THRESHOLDS,
+                   bins: int = 100) -> ChangeSummary:
+    """
+    Delta raster, change categories, area per category, summary stats and histogram in one pass.
+
+    Works on NDVI already downloaded on a shared grid (e.g. `combined_22` and
+    `combined_24`), so the change report needs no Earth Engine calls.
+
+    Parameters
+    ==========
+    ndvi_a, ndvi_b: np.ndarray
+        Earlier and later 2-D NDVI on the same grid; NaN marks missing pixels.
+    pixel_area: np.ndarray, optional
+        Pixel area in m², per row (see `pixel_area.pixel_areas`) or per pixel.
+        Without it every pixel counts as 1 m².
+    thresholds: sequence of float
+        Increasing category boundaries.
+    bins: int
+        Number of histogram buckets spanning the observed change range.
+
+    Returns
+    =======
+    ChangeSummary
+        The change raster and its summaries.
+    """
+    ndvi_a = np.asarray(ndvi_a, dtype=np.float32)
+    ndvi_b = np.asarray(ndvi_b, dtype=np.float32)
+    if ndvi_a.shape != ndvi_b.shape:
+        raise ValueError(f"Array shape mismatch: {ndvi_a.shape} vs {ndvi_b.shape}")
+
+    delta = ndvi_b - ndvi_a
+    category = classify_change_array(delta, thresholds)
+
+    valid = ~np.isnan(delta)
+    values = delta[valid].astype(np.float64)
+    if pixel_area is None:
+        weights = np.ones(values.size)
+    else:
+        pixel_area = np.asarray(pixel_area)
+        pixel_area = pixel_area[:, None] if pixel_area.ndim == 1 else pixel_area
+        weights = np.broadcast_to(pixel_area, delta.shape)[valid]
+
+    n_categories = len(thresholds) + 1
+    areas = np.bincount(category[valid], weights=weights, minlength=n_categories)[:n_categories]
+
+    if values.size:
+        stats = {
+            'mean': float(values.mean()),
+            'stdDev': float(values.std()),
+            'min': float(values.min()),
+            'max': float(values.max())
+        }
+        counts, edges = np.histogram(values, bins=bins, range=(stats['min'], stats['max']))
+    else:
+        stats = {'mean': np.nan, 'stdDev': np.nan, 'min': np.nan, 'max': np.nan}
+        counts, edges = np.zeros(0, dtype=np.int64), np.zeros(1)
+
+    histogram = pl.DataFrame({
+        'NDVI_Change': (edges[:-1] + edges[1:]) / 2,
+        'Pixel_Count': counts
+    })
+
+    return ChangeSummary(delta, category, change_category_labels(thresholds), areas, stats, histogram)
@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import ee
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class EEBatch:
+    """
+    Collect independent Earth Engine computations and evaluate them together.
+
+    Pending objects are wrapped in one `ee.Dictionary` and fetched with a
+    single `getInfo`, so the number of round trips no longer grows with the
+    number of summary values. If the combined request fails (e.g. one member
+    errors or the response is too large), every object is evaluated on its own
+    through a bounded thread pool instead.
+
+    Parameters
+    ==========
+    max_workers: int
+        Upper bound on concurrent `getInfo` calls in the fallback path.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._pending: Dict[str, ee.ComputedObject] = {}
+
+    def add(self, name: str, obj: ee.ComputedObject) -> str:
+        """
+        Queue `obj` for evaluation under `name` and return the name.
+        """
+        if name in self._pending:
+            raise ValueError(f"{name!r} is already queued")
+        self._pending[name] = obj
+        return name
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def resolve(self) -> Dict[str, Any]:
+        """
+        Evaluate every queued object and return the results by name.
+
+        The queue is emptied, so the batch can be reused.
+        """
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return {}
+
+        try:
+            return ee.Dictionary(pending).getInfo()
+        except ee.EEException as e:
+            print(f"Batched getInfo failed ({e}); evaluating {len(pending)} objects concurrently")
+
+        names = list(pending)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(names))) as executor:
+            values = list(executor.map(lambda name: pending[name].getInfo(), names))
+        return dict(zip(names, values))
+
+
+def get_info_batch(objects: Dict[str, ee.ComputedObject],
+                   max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Evaluate several independent Earth Engine objects with one `getInfo` where possible.
+
+    Parameters
+    ==========
+    objects: dict[str, ee.ComputedObject]
+        The computations to evaluate, by name.
+    max_workers: int, optional
+        Upper bound on concurrent calls if the batched request has to fall back.
+
+    Returns
+    =======
+    dict[str, Any]
+        The evaluated values, by name.
+    """
+    batch = EEBatch(max_workers or DEFAULT_MAX_WORKERS)
+    for name, obj in objects.items():
+        batch.add(name, obj)
+    return batch.resolve()
@@ -0,0 +1,882 @@
+import io
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import ee
+import rasterio
+import requests
+import rioxarray
+import xarray as xr
+import xee  # noqa: F401  (registers the 'ee' xarray backend)
+from rasterio.transform import Affine
+from rasterio.windows import Window
+
+from src.utils.geometry import geometry_summary
+from src.utils.raster_cache import RasterCache
+from src.utils.raster_io import IN_MEMORY_MAX_BYTES, open_rasterio_bytes
+
+# A (start_date, end_date) pair, e.g. ('2022-01-01', '2023-01-01')
+Period = Tuple[str, str]
+
+# Called with (bytes_written, total_bytes); total is None when the server omits Content-Length
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Output projection requested from Earth Engine
+EE_CRS = 'EPSG:4326'
+
+# getDownloadURL rejects requests above 48 MB or 32768 px per side; stay well below both
+MAX_REQUEST_BYTES = 32 * 1024 ** 2
+MAX_REQUEST_DIMENSION = 10000
+
+# Metres per degree Earth Engine uses to turn `scale` into an EPSG:4326 pixel size
+METERS_PER_DEGREE = 2 * math.pi * 6378137 / 360
+
+# Normalized-difference indices are delivered as float32
+NDVI_BYTES_PER_PIXEL = 4
+
+# Sentinel-2 band pairs for each supported normalized-difference index
+SPECTRAL_INDICES = {
+    'NDVI': ['B8', 'B4'],   # vegetation: (NIR - Red) / (NIR + Red)
+    'NDBI': ['B11', 'B8'],  # built-up: (SWIR1 - NIR) / (SWIR1 + NIR)
+    'NDWI': ['B3', 'B8'],   # water: (Green - NIR) / (Green + NIR)
+}
+
+DEFAULT_TILE_WORKERS = 8
+
+# 'download' fetches GeoTIFFs via getDownloadURL; 'xee' opens a lazy, chunked Dataset
+ENGINES = ('download', 'xee')
+
+# Lazily opened rasters must outlive the call that downloaded them, so they are
+# kept in one scratch directory that is removed when the interpreter exits.
+_download_dir = None
+_download_dir_lock = threading.Lock()
+
+
+def _get_download_dir() -> str:
+    global _download_dir
+    if _download_dir is None:
+        # Period and tile workers race here on first use; a losing TemporaryDirectory
+        # would be garbage-collected and delete the directory another thread was given
+        with _download_dir_lock:
+            if _download_dir is None:
+                _download_dir = tempfile.TemporaryDirectory(prefix='ee_fetch_')
+    return _download_dir.name
+
+
+def _scratch_path() -> str:
+    # Only a name: the file is created on first write, so in-memory downloads never touch disk
+    return os.path.join(_get_download_dir(), f"{uuid.uuid4().hex}.tif")
+
+
+def print_progress(label: str) -> ProgressCallback:
+    """
+    Build a progress callback that prints every 10% (or every 10 MB when the size is unknown).
+
+    Parameters
+    ==========
+    label: str
+        Prefix for the printed lines, e.g. the period being downloaded.
+
+    Returns
+    =======
+    callable
+        A callback suitable for the `progress` argument of `stream_download`.
+    """
+    last_step = [-1]
+
+    def callback(written: int, total: Optional[int]):
+        if total:
+            step = written * 10 // total
+            message = f"{label}: {written / 1e6:.1f}/{total / 1e6:.1f} MB ({step * 10}%)"
+        else:
+            step = written // (10 * DOWNLOAD_CHUNK_SIZE)
+            message = f"{label}: {written / 1e6:.1f} MB"
+        if step > last_step[0]:
+            last_step[0] = step
+            print(message)
+
+    return callback
+
+
+def stream_download(url: str, path: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+                    progress: Optional[ProgressCallback] = None, timeout: int = 300) -> int:
+    """
+    Stream a URL to disk chunk by chunk so peak memory is bounded by `chunk_size`.
+
+    Parameters
+    ==========
+    url: str
+        The URL to download.
+    path: str
+        Destination file path.
+    chunk_size: int
+        Number of bytes read from the socket per write.
+    progress: callable, optional
+        Called as `progress(bytes_written, total_bytes)` after every chunk.
+    timeout: int
+        Socket timeout in seconds.
+
+    Returns
+    =======
+    int
+        The number of bytes written.
+    """
+    written = 0
+    with requests.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        total = int(response.headers.get('Content-Length', 0)) or None
+
+        with open(path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                written += len(chunk)
+                if progress is not None:
+                    progress(written, total)
+    return written
+
+
+def download_raster(url: str, path: str, max_memory_bytes: int = IN_MEMORY_MAX_BYTES,
+                    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+                    progress: Optional[ProgressCallback] = None, timeout: int = 300) -> Optional[bytes]:
+    """
+    Download a raster into memory when it is small enough, otherwise stream it to `path`.
+
+    Responses are buffered in memory up to `max_memory_bytes`. A response that
+    announces a larger Content-Length, or grows past the limit while being read,
+    is written to `path` instead, so memory stays bounded either way.
+
+    Parameters
+    ==========
+    url: str
+        The URL to download.
+    path: str
+        Fallback destination for rasters above the threshold.
+    max_memory_bytes: int
+        Largest response kept in memory; 0 always writes to disk.
+    chunk_size: int
+        Number of bytes read from the socket at a time.
+    progress: callable, optional
+        Called as `progress(bytes_written, total_bytes)` after every chunk.
+    timeout: int
+        Socket timeout in seconds.
+
+    Returns
+    =======
+    bytes | None
+        The raster bytes, or None if the raster was written to `path`.
+    """
+    written = 0
+    with requests.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        total = int(response.headers.get('Content-Length', 0)) or None
+
+        buffer = io.BytesIO() if total is None or total <= max_memory_bytes else None
+        f = None
+        try:
+            if buffer is None:
+                f = open(path, 'wb')
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if buffer is not None and written + len(chunk) > max_memory_bytes:
+                    # Spill what we have so far and continue on disk
+                    f = open(path, 'wb')
+                    f.write(buffer.getvalue())
+                    buffer = None
+                (buffer if buffer is not None else f).write(chunk)
+                written += len(chunk)
+                if progress is not None:
+                    progress(written, total)
+        finally:
+            if f is not None:
+                f.close()
+
+    return buffer.getvalue() if buffer is not None else None
+
+
+_bounds_cache = {}
+
+
+def geometry_bounds(aoi_geometry: Union[ee.Geometry, Dict]) -> Tuple[float, float, float, float]:
+    """
+    Return (min_x, min_y, max_x, max_y) of an Earth Engine geometry in EPSG:4326.
+
+    Results are memoised per serialised geometry, so repeated fetches over the
+    same AOI only pay for one `getInfo` round trip. GeoJSON AOIs are measured
+    locally without any round trip.
+    """
+    if isinstance(aoi_geometry, dict):
+        return tuple(geometry_summary(aoi_geometry).bbox)
+
+    cache_key = aoi_geometry.serialize()
+    if cache_key not in _bounds_cache:
+        ring = aoi_geometry.bounds().getInfo()['coordinates'][0]
+        xs = [p[0] for p in ring]
+        ys = [p[1] for p in ring]
+        _bounds_cache[cache_key] = (min(xs), min(ys), max(xs), max(ys))
+    return _bounds_cache[cache_key]
+
+
+def aoi_bounds(config: dict, aoi_geometry: Union[ee.Geometry, Dict]) -> Tuple[float, float, float, float]:
+    """
+    AOI bounds in EPSG:4326, preferring a locally computed `config['aoi_bounds']`.
+
+    Setting 'aoi_bounds' (e.g. to `geometry_summary(geojson).bbox`) keeps grid
+    planning free of Earth Engine round trips; otherwise see `geometry_bounds`.
+    """
+    bounds = config.get('aoi_bounds')
+    return tuple(bounds) if bounds is not None else geometry_bounds(aoi_geometry)
+
+
+def grid_for_bounds(bounds: Tuple[float, float, float, float],
+                    resolution: float) -> Tuple[Affine, int, int]:
+    """
+    Return the north-up (transform, width, height) grid covering `bounds` at `resolution`.
+    """
+    min_x, min_y, max_x, max_y = bounds
+    width = max(1, math.ceil((max_x - min_x) / resolution))
+    height = max(1, math.ceil((max_y - min_y) / resolution))
+    return Affine(resolution, 0, min_x, 0, -resolution, max_y), width, height
+
+
+def raster_grid(da: xr.DataArray, default_crs: Optional[str] = None) -> Dict:
+    """
+    Describe the pixel grid of a georeferenced DataArray for `config['grid']`.
+
+    Parameters
+    ==========
+    da: xr.DataArray
+        Raster whose grid Earth Engine output should match (e.g. a Cecil layer).
+    default_crs: str, optional
+        CRS to assume when `da` has none written.
+
+    Returns
+    =======
+    dict
+        'crs', 'crs_transform' (six affine coefficients), 'width' and 'height'.
+    """
+    crs = da.rio.crs
+    if crs is None:
+        if default_crs is None:
+            raise ValueError("DataArray has no CRS and no default_crs was given")
+        crs = default_crs
+    height, width = da.rio.shape
+    return {
+        'crs': str(crs),
+        'crs_transform': list(da.rio.transform())[:6],
+        'width': int(width),
+        'height': int(height)
+    }
+
+
+def plan_tiles(transform: Affine, width: int, height: int, tile_size: int) -> List[Dict]:
+    """
+    Split a pixel grid into download tiles that share its alignment.
+
+    Parameters
+    ==========
+    transform: Affine
+        Transform of the full grid.
+    width, height: int
+        Size of the full grid in pixels.
+    tile_size: int
+        Maximum tile width/height in pixels.
+
+    Returns
+    =======
+    list[dict]
+        One dict per tile with a rasterio `window` and the matching Earth
+        Engine `crs_transform`.
+    """
+    tiles = []
+    for row_off in range(0, height, tile_size):
+        for col_off in range(0, width, tile_size):
+            window = Window(col_off, row_off,
+                            min(tile_size, width - col_off),
+                            min(tile_size, height - row_off))
+            tile_transform = transform * Affine.translation(col_off, row_off)
+            tiles.append({
+                'window': window,
+                'crs_transform': list(tile_transform)[:6]
+            })
+    return tiles
+
+
+def _download_tiled(image: ee.Image, path: str, crs: str, transform: Affine, width: int, height: int,
+                    tile_size: int, max_workers: int, progress: Optional[ProgressCallback] = None):
+    """
+    Fetch `image` tile by tile in parallel and mosaic the tiles into one GeoTIFF at `path`.
+
+    Tiles share a single pixel grid, so each one is written straight into its
+    window of the output; only one tile is held in memory at a time.
+    """
+    tiles = plan_tiles(transform, width, height, tile_size)
+    print(f"Downloading {len(tiles)} tiles ({width}x{height} px) with {max_workers} workers")
+
+    lock = threading.Lock()
+    written = [0]
+
+    def tile_progress(delta: int):
+        if progress is not None:
+            with lock:
+                written[0] += delta
+                progress(written[0], None)
+
+    def fetch_tile(tile: Dict) -> str:
+        window = tile['window']
+        url = image.getDownloadURL({
+            'crs': crs,
+            'crs_transform': tile['crs_transform'],
+            'dimensions': f"{window.width}x{window.height}",
+            'format': 'GEO_TIFF'
+        })
+        fd, tile_path = tempfile.mkstemp(suffix='.tif', dir=_get_download_dir())
+        os.close(fd)
+        last = [0]
+
+        def on_chunk(done: int, total: Optional[int]):
+            tile_progress(done - last[0])
+            last[0] = done
+
+        stream_download(url, tile_path, progress=on_chunk)
+        return tile_path
+
+    dst = None
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetch_tile, tile): tile for tile in tiles}
+            for future in as_completed(futures):
+                tile_path = future.result()
+                try:
+                    with rasterio.open(tile_path) as src:
+                        if dst is None:
+                            dst = rasterio.open(
+                                path, 'w', driver='GTiff', width=width, height=height,
+                                count=src.count, dtype=src.dtypes[0], nodata=src.nodata,
+                                crs=crs, transform=transform, tiled=True,
+                                compress='DEFLATE', BIGTIFF='IF_SAFER'
+                            )
+                            dst.descriptions = src.descriptions
+                        dst.write(src.read(), window=futures[future]['window'])
+                finally:
+                    os.remove(tile_path)
+    finally:
+        if dst is not None:
+            dst.close()
+
+
+def download_image(image: ee.Image, path: str, config: dict, aoi_geometry: ee.Geometry,
+                   progress: Optional[ProgressCallback] = None,
+                   bytes_per_pixel: int = NDVI_BYTES_PER_PIXEL) -> Optional[bytes]:
+    """
+    Download an Earth Engine image over the AOI as a GeoTIFF, tiling when needed.
+
+    By default the image is requested in EPSG:4326 at `config['scale']` over
+    the AOI. When `config['grid']` is set (see `raster_grid`) it is requested
+    on exactly that grid instead, via `crs`, `crs_transform` and `dimensions`.
+
+    With `config['tiling']` set to 'auto' (the default) the request is split
+    into tiles only when the estimated size would exceed Earth Engine's
+    per-request limits; True always tiles and False never does. Single
+    requests no larger than `config['in_memory_max_bytes']` are kept in memory.
+
+    Parameters
+    ==========
+    image: ee.Image
+        The image to download.
+    path: str
+        Destination GeoTIFF path.
+    config: dict
+        Analysis configuration. Optional keys: 'grid', 'aoi_bounds' (see
+        `aoi_bounds`), 'tiling', 'tile_size' (pixels per tile side),
+        'tile_workers' (concurrent tile downloads) and 'in_memory_max_bytes'.
+    aoi_geometry: ee.Geometry
+        The Area of Interest to download.
+    progress: callable, optional
+        Byte-level progress callback, see `stream_download`.
+    bytes_per_pixel: int
+        Size of one pixel across all bands, used to size the tiles.
+
+    Returns
+    =======
+    bytes | None
+        The GeoTIFF bytes when kept in memory, or None if it was written to `path`.
+    """
+    grid = config.get('grid')
+    tiling = config.get('tiling', 'auto')
+
+    if grid is not None:
+        crs = grid['crs']
+        transform = Affine(*grid['crs_transform'][:6])
+        width, height = grid['width'], grid['height']
+    elif tiling:
+        crs = EE_CRS
+        transform, width, height = grid_for_bounds(
+            aoi_bounds(config, aoi_geometry), config['scale'] / METERS_PER_DEGREE
+        )
+
+    if tiling == 'auto':
+        fits = (width * height * bytes_per_pixel <= MAX_REQUEST_BYTES
+                and max(width, height) <= MAX_REQUEST_DIMENSION)
+        if fits:
+            tiling = False
+
+    if not tiling:
+        if grid is not None:
+            request = {
+                'crs': crs,
+                'crs_transform': list(transform)[:6],
+                'dimensions': f"{width}x{height}",
+                'format': 'GEO_TIFF'
+            }
+        else:
+            request = {
+                'scale': config['scale'],
+                'region': aoi_geometry,
+                'crs': EE_CRS,
+                'format': 'GEO_TIFF'
+            }
+        # Get download URL directly from EE (uses your authenticated project)
+        url = image.getDownloadURL(request)
+        return download_raster(url, path, progress=progress,
+                               max_memory_bytes=config.get('in_memory_max_bytes', IN_MEMORY_MAX_BYTES))
+
+    tile_size = config.get('tile_size') or min(
+        MAX_REQUEST_DIMENSION, math.isqrt(MAX_REQUEST_BYTES // bytes_per_pixel)
+    )
+    _download_tiled(image, path, crs, transform, width, height, tile_size,
+                    config.get('tile_workers', DEFAULT_TILE_WORKERS), progress=progress)
+    return None
+
+
+def build_composite(config: dict, aoi_geometry: ee.Geometry, start_date: str, end_date: str) -> ee.Image:
+    """
+    Build the cloud-filtered median composite for a single time window.
+
+    Parameters
+    ==========
+    config: dict
+        Analysis configuration with 'satellite' and 'cloud_threshold' keys.
+    aoi_geometry: ee.Geometry
+        The Area of Interest to filter and clip the collection to.
+    start_date: str
+        Inclusive start of the window (YYYY-MM-DD).
+    end_date: str
+        Exclusive end of the window (YYYY-MM-DD).
+
+    Returns
+    =======
+    ee.Image
+        The clipped median composite with all spectral bands.
+    """
+    collection = (ee.ImageCollection(config['satellite'])
+        .filterDate(start_date, end_date)
+        .filterBounds(aoi_geometry)
+        .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', config['cloud_threshold'])))
+
+    return collection.median().clip(aoi_geometry)
+
+
+def build_ndvi_image(config: dict, aoi_geometry: ee.Geometry, start_date: str, end_date: str) -> ee.Image:
+    """
+    Build the median NDVI composite for a single time window.
+
+    Returns
+    =======
+    ee.Image
+        A single-band image named 'NDVI'.
+    """
+    composite = build_composite(config, aoi_geometry, start_date, end_date)
+    return composite.normalizedDifference(SPECTRAL_INDICES['NDVI']).rename('NDVI')
+
+
+def build_stacked_image(config: dict, aoi_geometry: ee.Geometry, periods: List[Period],
+                        indices: List[str]) -> ee.Image:
+    """
+    Stack every (period, index) combination into one multi-band image.
+
+    Bands are ordered period-major, i.e. all indices of the first period come
+    first, which is the order `get_ee_stack` relies on to split them again.
+
+    Parameters
+    ==========
+    config: dict
+        Analysis configuration with 'satellite' and 'cloud_threshold' keys.
+    aoi_geometry: ee.Geometry
+        The Area of Interest to filter and clip the collections to.
+    periods: list[tuple[str, str]]
+        The (start_date, end_date) windows to composite.
+    indices: list[str]
+        Names of the indices to compute, keys of `SPECTRAL_INDICES`.
+
+    Returns
+    =======
+    ee.Image
+        Image with `len(periods) * len(indices)` bands named '<index>_<period number>'.
+    """
+    unknown = [name for name in indices if name not in SPECTRAL_INDICES]
+    if unknown:
+        raise ValueError(f"Unsupported spectral indices: {unknown}")
+
+    bands = []
+    for i, (start_date, end_date) in enumerate(periods):
+        composite = build_composite(config, aoi_geometry, start_date, end_date)
+        for name in indices:
+            bands.append(composite.normalizedDifference(SPECTRAL_INDICES[name]).rename(f"{name}_{i}"))
+    return ee.Image.cat(bands)
+
+
+def open_xee(image: ee.Image, config: dict, aoi_geometry: ee.Geometry,
+             chunks: Union[str, dict, None] = 'auto') -> xr.Dataset:
+    """
+    Open an Earth Engine image lazily through the xee backend.
+
+    Only the chunks that are actually computed downstream are requested from
+    Earth Engine, and dask fetches them in parallel. The result is normalised
+    to the layout of a downloaded GeoTIFF: one variable per image band with
+    ('band', 'y', 'x') dimensions, north-up, with the CRS written.
+
+    Parameters
+    ==========
+    image: ee.Image
+        The image to open.
+    config: dict
+        Analysis configuration with a 'scale' key (metres), optional
+        'aoi_bounds' (see `aoi_bounds`) and an optional 'grid' (see
+        `raster_grid`) to open on instead.
+    aoi_geometry: ee.Geometry
+        The Area of Interest bounding the opened grid.
+    chunks: str | dict | None
+        Chunking passed to xee; None loads the data eagerly.
+
+    Returns
+    =======
+    xr.Dataset
+        One variable per band of `image`.
+    """
+    grid = config.get('grid')
+    if grid is not None:
+        # Open on exactly the requested grid rather than a scale/CRS pair
+        crs = grid['crs']
+        transform = Affine(*grid['crs_transform'][:6])
+        width, height = grid['width'], grid['height']
+    else:
+        # Same grid the tiled download path derives from the AOI bounds
+        crs = EE_CRS
+        transform, width, height = grid_for_bounds(
+            aoi_bounds(config, aoi_geometry), config['scale'] / METERS_PER_DEGREE
+        )
+
+    # xee >= 0.1 takes the pixel grid explicitly and names the dimensions ('time', 'y', 'x')
+    ds = xr.open_dataset(
+        ee.ImageCollection([image]),
+        engine='ee',
+        chunks='auto' if chunks is None else chunks,
+        crs=crs,
+        crs_transform=tuple(transform)[:6],
+        shape_2d=(width, height)
+    )
+
+    if 'time' in ds.dims:
+        ds = ds.isel(time=0, drop=True)
+    ds = ds.transpose(..., 'y', 'x').sortby('y', ascending=False).sortby('x')
+    ds = ds.expand_dims(band=[1]).rio.write_crs(crs)
+
+    return ds.load() if chunks is None else ds
+
+
+def _grid_cache_params(config: dict) -> dict:
+    """
+    Cache-key fields that decide the output pixel grid.
+
+    An explicit 'grid' fixes the grid for both download paths. Without one, a
+    single request lets Earth Engine derive the grid from the region and
+    scale, while the tiled path mosaics onto `grid_for_bounds` of the AOI
+    bounds. The two can differ, so 'tiling' and the bounds override are keyed.
+    'tile_size' is not: `plan_tiles` cuts every tile from the same full grid,
+    so the mosaic is identical for any tile size.
+    """
+    if config.get('grid') is not None:
+        return {'grid': config['grid']}
+    return {
+        'tiling': config.get('tiling', 'auto'),
+        'aoi_bounds': config.get('aoi_bounds')
+    }
+
+
+def ee_cache_params(config: dict, start_date: str, end_date: str) -> dict:
+    """
+    Collect every request parameter that determines the downloaded NDVI raster.
+
+    Parameters
+    ==========
+    config: dict
+        Analysis configuration.
+    start_date: str
+        Inclusive start of the window (YYYY-MM-DD).
+    end_date: str
+        Exclusive end of the window (YYYY-MM-DD).
+
+    Returns
+    =======
+    dict
+        Parameters used (together with the AOI) to key the raster cache.
+    """
+    params = {
+        'product': 'NDVI',
+        'satellite': config['satellite'],
+        'start_date': start_date,
+        'end_date': end_date,
+        'cloud_threshold': config['cloud_threshold'],
+        'scale': config['scale'],
+        'crs': EE_CRS
+    }
+    params.update(_grid_cache_params(config))
+    return params
+
+
+def _open_raster(path: str, chunks: Union[str, dict, None]) -> xr.DataArray:
+    if chunks is None:
+        return rioxarray.open_rasterio(path).load()
+    return rioxarray.open_rasterio(path, chunks=chunks)
+
+
+def _fetch_raster(image: ee.Image, params: dict, config: dict, aoi_geometry: ee.Geometry,
+                  chunks: Union[str, dict, None], progress: Optional[ProgressCallback],
+                  cache: Optional[RasterCache], refresh: bool,
+                  bytes_per_pixel: int) -> xr.DataArray:
+    """
+    Serve `image` from the cache or download it, returning a (band, y, x) DataArray.
+    """
+    if cache is not None:
+        key = cache.key(params, aoi_geometry)
+        if refresh:
+            cache.invalidate(key)
+        cached_path = cache.get(key)
+        if cached_path is not None:
+            return _open_raster(str(cached_path), chunks)
+
+    tmp_file = _scratch_path()
+
+    try:
+        data = download_image(image, tmp_file, config, aoi_geometry,
+                              progress=progress, bytes_per_pixel=bytes_per_pixel)
+
+        if cache is not None:
+            cached_path = cache.put(key, data if data is not None else tmp_file, metadata=params)
+            if cached_path is not None:
+                if data is None:
+                    os.remove(tmp_file)
+                return _open_raster(str(cached_path), chunks)
+            # Larger than the whole cache: serve this download uncached
+
+        if data is not None:
+            da = open_rasterio_bytes(data)
+            return da if chunks is None else da.chunk(chunks)
+
+        da = _open_raster(tmp_file, chunks)
+        if chunks is None:
+            os.remove(tmp_file)
+    except Exception:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+    return da
+
+
+def _resolve_engine(config: dict, engine: Optional[str]) -> str:
+    engine = engine or config.get('engine', 'download')
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+    return engine
+
+
+def get_ee_xarray(config: dict, aoi_geometry: ee.Geometry, start_date: str, end_date: str,
+                  chunks: Union[str, dict, None] = 'auto',
+                  progress: Optional[ProgressCallback] = None,
+                  cache: Optional[RasterCache] = None, refresh: bool = False,
+                  engine: Optional[str] = None) -> xr.Dataset:
+    """
+    Download the NDVI composite for a time window using EE's native download URL.
+
+    The GeoTIFF is streamed straight to disk (in parallel tiles for AOIs beyond
+    the per-request limit, see `download_image`) and, unless `chunks` is None,
+    opened lazily so memory stays flat regardless of the raster size. When a
+    `cache` is given, a hit is served from disk without contacting Earth Engine.
+
+    Parameters
+    ==========
+    config: dict
+        Analysis configuration with 'satellite', 'cloud_threshold' and 'scale' keys.
+    aoi_geometry: ee.Geometry
+        The Area of Interest to download.
+    start_date: str
+        Inclusive start of the window (YYYY-MM-DD).
+    end_date: str
+        Exclusive end of the window (YYYY-MM-DD).
+    chunks: str | dict | None
+        Dask chunking passed to `rioxarray.open_rasterio`. None loads the raster
+        eagerly and removes any downloaded file immediately. Rasters small
+        enough to be decoded in memory are always loaded, then rechunked.
+    progress: callable, optional
+        Byte-level progress callback, see `stream_download`.
+    cache: RasterCache, optional
+        On-disk raster cache to read from and populate.
+    refresh: bool
+        Drop any cached copy and download again.
+    engine: str, optional
+        'download' (GeoTIFF via getDownloadURL) or 'xee' (lazy, see `open_xee`).
+        Defaults to `config['engine']`, then 'download'. The xee engine
+        ignores `progress`, `cache` and `refresh`.
+
+    Returns
+    =======
+    xr.Dataset
+        Dataset with a single 'NDVI' variable.
+    """
+    ndvi = build_ndvi_image(config, aoi_geometry, start_date, end_date)
+
+    if _resolve_engine(config, engine) == 'xee':
+        return open_xee(ndvi, config, aoi_geometry, chunks)
+
+    params = ee_cache_params(config, start_date, end_date)
+
+    da = _fetch_raster(ndvi, params, config, aoi_geometry, chunks, progress, cache, refresh,
+                       bytes_per_pixel=NDVI_BYTES_PER_PIXEL)
+    return da.to_dataset(name='NDVI')
+
+
+def get_ee_stack(config: dict, aoi_geometry: ee.Geometry, periods: List[Period],
+                 indices: Optional[List[str]] = None,
+                 chunks: Union[str, dict, None] = 'auto',
+                 progress: Optional[ProgressCallback] = None,
+                 cache: Optional[RasterCache] = None, refresh: bool = False,
+                 engine: Optional[str] = None) -> Dict[Period, xr.Dataset]:
+    """
+    Fetch several periods and spectral indices with a single multi-band request.
+
+    All (period, index) composites are stacked into one image (see
+    `build_stacked_image`), downloaded as one GeoTIFF and split back into one
+    Dataset per period with a variable per index. Each variable keeps a
+    length-1 'band' dimension so it is interchangeable with `get_ee_xarray`.
+
+    Parameters
+    ==========
+    config: dict
+        Analysis configuration with 'satellite', 'cloud_threshold' and 'scale' keys.
+    aoi_geometry: ee.Geometry
+        The Area of Interest to download.
+    periods: list[tuple[str, str]]
+        The (start_date, end_date) windows to fetch.
+    indices: list[str], optional
+        Keys of `SPECTRAL_INDICES`; defaults to ['NDVI'].
+    chunks, progress, cache, refresh, engine
+        As for `get_ee_xarray`.
+
+    Returns
+    =======
+    dict[tuple[str, str], xr.Dataset]
+        Mapping of each requested period to a Dataset with one variable per index.
+    """
+    periods = list(dict.fromkeys(periods))
+    indices = list(indices or ['NDVI'])
+    if not periods:
+        return {}
+
+    image = build_stacked_image(config, aoi_geometry, periods, indices)
+
+    if _resolve_engine(config, engine) == 'xee':
+        stack = open_xee(image, config, aoi_geometry, chunks)
+        return {
+            period: xr.Dataset({name: stack[f"{name}_{i}"] for name in indices})
+            for i, period in enumerate(periods)
+        }
+
+    params = {
+        'product': 'stack',
+        'indices': indices,
+        'periods': periods,
+        'satellite': config['satellite'],
+        'cloud_threshold': config['cloud_threshold'],
+        'scale': config['scale'],
+        'crs': EE_CRS
+    }
+    params.update(_grid_cache_params(config))
+
+    stack = _fetch_raster(image, params, config, aoi_geometry, chunks, progress, cache, refresh,
+                          bytes_per_pixel=NDVI_BYTES_PER_PIXEL * len(periods) * len(indices))
+
+    datasets = {}
+    for i, period in enumerate(periods):
+        variables = {}
+        for j, name in enumerate(indices):
+            band = i * len(indices) + j
+            variables[name] = stack.isel(band=[band]).assign_coords(band=[1])
+        datasets[period] = xr.Dataset(variables)
+    return datasets
+
+
+def fetch_periods(config: dict, aoi_geometry: ee.Geometry, periods: List[Period],
+                  max_workers: int = 4, **kwargs) -> Dict[Period, xr.Dataset]:
+    """
+    Fetch NDVI composites for several time windows concurrently.
+
+    Both the `getDownloadURL` negotiation and the download itself are
+    network-bound, so the periods are resolved through a bounded thread pool
+    and the wall-clock time stays close to a single round trip.
+
+    Parameters
+    ==========
+    config: dict
+        Analysis configuration passed through to `get_ee_xarray`.
+    aoi_geometry: ee.Geometry
+        The Area of Interest to download.
+    periods: list[tuple[str, str]]
+        The (start_date, end_date) windows to fetch.
+    max_workers: int
+        Upper bound on the number of simultaneous requests.
+    **kwargs
+        Extra keyword arguments for `get_ee_xarray` (e.g. `chunks`, `cache`).
+
+    Returns
+    =======
+    dict[tuple[str, str], xr.Dataset]
+        Mapping of each requested period to its NDVI dataset.
+    """
+    periods = list(dict.fromkeys(periods))
+    if not periods:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(periods))) as executor:
+        futures = {
+            period: executor.submit(get_ee_xarray, config, aoi_geometry, *period, **kwargs)
+            for period in periods
+        }
+        return {period: future.result() for period, future in futures.items()}
+
+
+def benchmark_engines(config: dict, aoi_geometry: ee.Geometry, start_date: str, end_date: str,
+                      engines: Tuple[str, ...] = ENGINES) -> Dict[str, float]:
+    """
+    Time a full NDVI fetch (request plus `.load()`) with each engine on the same AOI.
+
+    The download engine runs without a cache so both engines pay for the network.
+
+    Returns
+    =======
+    dict[str, float]
+        Wall-clock seconds per engine.
+    """
+    timings = {}
+    for engine in engines:
+        start = time.perf_counter()
+        get_ee_xarray(config, aoi_geometry, start_date, end_date, engine=engine).load()
+        timings[engine] = time.perf_counter() - start
+    return timings
@@ -0,0 +1,90 @@
+from typing import List, Sequence
+
+import ee
+
+from src.utils.change_detection import CHANGE_THRESHOLDS
+
+
+def classify_change(ndvi_change: ee.Image,
+                    thresholds: Sequence[float] = CHANGE_THRESHOLDS) -> ee.Image:
+    """
+    Classify an NDVI change image into one integer category band.
+
+    Category k (0..len(thresholds)) holds changes between thresholds k-1 and k,
+    with the same boundary rules as `change_detection.change_category_labels`.
+
+    Parameters
+    ==========
+    ndvi_change: ee.Image
+        Single-band NDVI difference.
+    thresholds: sequence of float
+        Increasing category boundaries.
+
+    Returns
+    =======
+    ee.Image
+        Band 'category' (uint8), masked where `ndvi_change` is masked.
+    """
+    category = ee.Image.constant(0)
+    for t in thresholds:
+        step = ndvi_change.gte(t) if t <= 0 else ndvi_change.gt(t)
+        category = category.add(step)
+    return category.toUint8().rename('category').updateMask(ndvi_change.mask())
+
+
+def change_category_reduction(ndvi_change: ee.Image, geometry: ee.Geometry, scale: float,
+                              max_pixels: float = 1e8,
+                              thresholds: Sequence[float] = CHANGE_THRESHOLDS) -> ee.Dictionary:
+    """
+    Server-side area (m²) per change category from one grouped `ee.Reducer.sum()`.
+
+    Returns the unevaluated reduceRegion result, so it can be combined with
+    other computations before a single `getInfo`; see `category_areas`.
+    """
+    image = ee.Image.pixelArea().addBands(classify_change(ndvi_change, thresholds))
+    return image.reduceRegion(
+        reducer=ee.Reducer.sum().group(groupField=1, groupName='category'),
+        geometry=geometry,
+        scale=scale,
+        maxPixels=max_pixels
+    )
+
+
+def category_areas(reduction: dict, n_categories: int) -> List[float]:
+    """
+    Area (m²) per category, in category order, from an evaluated `change_category_reduction`.
+
+    Categories without pixels get 0.
+    """
+    areas = [0.0] * n_categories
+    for group in reduction.get('groups', []):
+        areas[int(group['category'])] = group['sum']
+    return areas
+
+
+def change_category_areas(ndvi_change: ee.Image, geometry: ee.Geometry, scale: float,
+                          max_pixels: float = 1e8,
+                          thresholds: Sequence[float] = CHANGE_THRESHOLDS) -> List[float]:
+    """
+    Area (m²) of every NDVI change category with a single Earth Engine round trip.
+
+    Parameters
+    ==========
+    ndvi_change: ee.Image
+        Single-band NDVI difference.
+    geometry: ee.Geometry
+        Region to reduce over.
+    scale: float
+        Nominal scale in metres.
+    max_pixels: float
+        `maxPixels` for the reduction.
+    thresholds: sequence of float
+        Increasing category boundaries; more categories add no round trips.
+
+    Returns
+    =======
+    list[float]
+        Area per category in square metres, len(thresholds) + 1 entries.
+    """
+    reduction = change_category_reduction(ndvi_change, geometry, scale, max_pixels, thresholds)
+    return category_areas(reduction.getInfo(), len(thresholds) + 1)
@@ -0,0 +1,131 @@
+import hashlib
+import json
+from typing import Dict, List, Tuple
+
+import numpy as np
+from pyproj import Geod
+
+_GEOD = Geod(ellps='WGS84')
+
+_summary_cache: Dict[str, 'GeometrySummary'] = {}
+
+
+def _polygons(geojson: Dict) -> List[List]:
+    # Every polygon (list of rings) in a GeoJSON object, across all features
+    geom_type = geojson.get('type')
+    if geom_type == 'FeatureCollection':
+        return [p for feature in geojson['features'] for p in _polygons(feature)]
+    if geom_type == 'Feature':
+        return _polygons(geojson['geometry']) if geojson.get('geometry') else []
+    if geom_type == 'GeometryCollection':
+        return [p for geometry in geojson['geometries'] for p in _polygons(geometry)]
+    if geom_type == 'Polygon':
+        return [geojson['coordinates']]
+    if geom_type == 'MultiPolygon':
+        return list(geojson['coordinates'])
+    raise ValueError(f"Unsupported geometry type for area calculations: {geom_type}")
+
+
+def geometry_hash(geojson: Dict) -> str:
+    """
+    Stable SHA-256 of the polygon coordinates in a GeoJSON object (properties are ignored).
+    """
+    payload = json.dumps(_polygons(geojson), separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class GeometrySummary:
+    """
+    Geodesic area, bounding box and centroid of every polygon in a GeoJSON AOI.
+
+    Computed locally, so the notebooks, the STAC writer and the map renderer do
+    not need Earth Engine round trips for these values.
+
+    Attributes
+    ==========
+    area_m2: float
+        Geodesic area on the WGS84 ellipsoid, holes subtracted.
+    bbox: list[float]
+        [min_lon, min_lat, max_lon, max_lat] over all features.
+    centroid: list[float]
+        Area-weighted [lon, lat] centroid over all features.
+    geometry: dict
+        The features' polygons merged into one Polygon or MultiPolygon.
+    """
+
+    def __init__(self, area_m2: float, bbox: List[float], centroid: List[float], geometry: Dict):
+        self.area_m2 = area_m2
+        self.bbox = bbox
+        self.centroid = centroid
+        self.geometry = geometry
+
+    @property
+    def area_ha(self) -> float:
+        return self.area_m2 / 10_000
+
+    @property
+    def bbox_center(self) -> List[float]:
+        min_x, min_y, max_x, max_y = self.bbox
+        return [(min_x + max_x) / 2, (min_y + max_y) / 2]
+
+
+def _ring_measures(ring: np.ndarray) -> Tuple[float, float, float, float]:
+    # Geodesic area plus planar (shoelace) signed area and centroid of one ring
+    lons, lats = ring[:, 0], ring[:, 1]
+    geodesic_area, _ = _GEOD.polygon_area_perimeter(lons, lats)
+
+    x, y = lons - lons[0], lats - lats[0]
+    cross = x[:-1] * y[1:] - x[1:] * y[:-1]
+    planar_area = cross.sum() / 2
+    if planar_area == 0:
+        return abs(geodesic_area), 0.0, lons.mean(), lats.mean()
+    cx = ((x[:-1] + x[1:]) * cross).sum() / (6 * planar_area) + lons[0]
+    cy = ((y[:-1] + y[1:]) * cross).sum() / (6 * planar_area) + lats[0]
+    return abs(geodesic_area), abs(planar_area), cx, cy
+
+
+def geometry_summary(geojson: Dict) -> GeometrySummary:
+    """
+    Summarise a GeoJSON AOI (FeatureCollection, Feature or geometry), cached by geometry hash.
+
+    Parameters
+    ==========
+    geojson: dict
+        The AOI, e.g. the parsed contents of `data/colossus.json`.
+
+    Returns
+    =======
+    GeometrySummary
+        Area, bounding box, centroid and merged geometry of all polygons.
+    """
+    key = geometry_hash(geojson)
+    if key in _summary_cache:
+        return _summary_cache[key]
+
+    polygons = _polygons(geojson)
+    if not polygons:
+        raise ValueError("GeoJSON contains no polygons")
+
+    coords = np.concatenate([np.asarray(ring, dtype=np.float64)[:, :2]
+                             for polygon in polygons for ring in polygon])
+    bbox = [*coords.min(axis=0).tolist(), *coords.max(axis=0).tolist()]
+
+    area = 0.0
+    weight = 0.0
+    moment = np.zeros(2)
+    for polygon in polygons:
+        for i, ring in enumerate(polygon):
+            # Exterior rings add, holes subtract
+            sign = 1 if i == 0 else -1
+            ring_area, planar_area, cx, cy = _ring_measures(np.asarray(ring, dtype=np.float64)[:, :2])
+            area += sign * ring_area
+            weight += sign * planar_area
+            moment += sign * planar_area * np.array([cx, cy])
+    centroid = (moment / weight).tolist() if weight else coords.mean(axis=0).tolist()
+
+    geometry = ({'type': 'Polygon', 'coordinates': polygons[0]} if len(polygons) == 1
+                else {'type': 'MultiPolygon', 'coordinates': polygons})
+
+    summary = GeometrySummary(area, bbox, centroid, geometry)
+    _summary_cache[key] = summary
+    return summary
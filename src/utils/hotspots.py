@@ -0,0 +1,177 @@
+from typing import Optional, Tuple
+
+import geopandas as gpd
+import numpy as np
+import polars as pl
+from rasterio import features
+from scipy import ndimage
+from shapely.geometry import shape
+
+from src.utils.land_cover import to_codes, valid_codes
+from src.utils.pixel_area import SQUARE_METERS_PER_HECTARE
+
+# |Δ NDVI| above which a pixel counts as significant change
+SIGNIFICANT_CHANGE = 0.1
+DIRECTIONS = ('Loss', 'Gain')
+
+# 8-connectivity: diagonal neighbours belong to the same patch
+_STRUCTURE = ndimage.generate_binary_structure(2, 2)
+
+
+def label_hotspots(delta: np.ndarray, threshold: float = SIGNIFICANT_CHANGE) -> Tuple[np.ndarray, int]:
+    """
+    Label connected patches of significant NDVI loss and gain.
+
+    Loss (Δ < -threshold) and gain (Δ > threshold) are labelled separately, so
+    a loss patch never merges with an adjacent gain patch. Loss patches get
+    ids 1..n_loss and gain patches follow.
+
+    Parameters
+    ==========
+    delta: np.ndarray
+        2-D NDVI change; NaN marks missing pixels.
+    threshold: float
+        Minimum absolute change for a pixel to be significant.
+
+    Returns
+    =======
+    tuple[np.ndarray, int]
+        int32 patch ids (0 = not significant) and the number of loss patches.
+    """
+    delta = np.asarray(delta)
+    labels, n_loss = ndimage.label(delta < -threshold, structure=_STRUCTURE, output=np.int32)
+    gain, n_gain = ndimage.label(delta > threshold, structure=_STRUCTURE, output=np.int32)
+    labels[gain > 0] = gain[gain > 0] + n_loss
+    return labels, n_loss
+
+
+def find_hotspots(delta: np.ndarray, land_cover: Optional[np.ndarray] = None,
+                  pixel_area: Optional[np.ndarray] = None,
+                  threshold: float = SIGNIFICANT_CHANGE,
+                  min_pixels: int = 1) -> Tuple[np.ndarray, pl.DataFrame]:
+    """
+    Connected change hotspots with per-patch area, mean change and dominant land cover.
+
+    Every statistic is one `np.bincount` over the patch labels, so the cost
+    stays linear in the number of pixels regardless of how many patches
+    there are. Patches are renumbered by area, largest first.
+
+    Parameters
+    ==========
+    delta: np.ndarray
+        2-D NDVI change (later minus earlier); NaN marks missing pixels.
+    land_cover: np.ndarray, optional
+        Class codes on the same grid (float with NaN for missing, or integer).
+        Values that are not whole numbers in 0..255 count as missing.
+    pixel_area: np.ndarray, optional
+        Pixel area in m², per row (see `pixel_area.pixel_areas`) or per pixel.
+        Without it every pixel counts as 1 m².
+    threshold: float
+        Minimum absolute change for a pixel to be significant.
+    min_pixels: int
+        Patches with fewer pixels are dropped.
+
+    Returns
+    =======
+    tuple[np.ndarray, pl.DataFrame]
+        int32 patch ids (0 = no hotspot) and one row per patch with
+        patch_id, direction, pixel_count, area_ha, mean_ndvi_change,
+        dominant_class and dominant_class_share.
+    """
+    delta = np.asarray(delta)
+    labels, n_loss = label_hotspots(delta, threshold)
+    n_labels = int(labels.max()) + 1
+
+    flat = labels.ravel()
+    if pixel_area is None:
+        weights = None
+    else:
+        pixel_area = np.asarray(pixel_area, dtype=np.float64)
+        pixel_area = pixel_area[:, None] if pixel_area.ndim == 1 else pixel_area
+        weights = np.broadcast_to(pixel_area, delta.shape).ravel()
+
+    counts = np.bincount(flat, minlength=n_labels)
+    areas = np.bincount(flat, weights=weights, minlength=n_labels) if weights is not None else counts.astype(np.float64)
+    delta_sums = np.bincount(flat, weights=np.nan_to_num(delta.ravel()), minlength=n_labels)
+
+    dominant = np.full(n_labels, -1, dtype=np.int64)
+    share = np.full(n_labels, np.nan)
+    if land_cover is not None:
+        land_cover = np.asarray(land_cover).reshape(delta.shape)
+        # Missing and nodata codes never vote; a patch without valid codes keeps a null class
+        in_patch = (labels > 0) & valid_codes(land_cover)
+        # Compact the class codes so the label x class table only spans classes present
+        present, class_idx = np.unique(to_codes(land_cover[in_patch]), return_inverse=True)
+        if present.size:
+            table = np.bincount(
+                labels[in_patch].astype(np.int64) * present.size + class_idx,
+                minlength=n_labels * present.size
+            ).reshape(n_labels, present.size)
+            totals = table.sum(axis=1)
+            has_class = totals > 0
+            best = table.argmax(axis=1)
+            dominant[has_class] = present[best[has_class]]
+            share[has_class] = table[has_class, best[has_class]] / totals[has_class]
+
+    # Keep patches above the size cut-off, ordered by area
+    patch_ids = np.flatnonzero(counts >= min_pixels)
+    patch_ids = patch_ids[patch_ids > 0]
+    patch_ids = patch_ids[np.argsort(-areas[patch_ids], kind='stable')]
+
+    renumber = np.zeros(n_labels, dtype=np.int32)
+    renumber[patch_ids] = np.arange(1, patch_ids.size + 1, dtype=np.int32)
+    labels = renumber[labels]
+
+    patches = pl.DataFrame({
+        'patch_id': np.arange(1, patch_ids.size + 1),
+        'direction': np.where(patch_ids <= n_loss, DIRECTIONS[0], DIRECTIONS[1]),
+        'pixel_count': counts[patch_ids],
+        'area_ha': areas[patch_ids] / SQUARE_METERS_PER_HECTARE,
+        'mean_ndvi_change': delta_sums[patch_ids] / counts[patch_ids],
+        'dominant_class': dominant[patch_ids],
+        'dominant_class_share': share[patch_ids]
+    }).with_columns([
+        pl.col('patch_id').cast(pl.UInt32),
+        pl.col('direction').cast(pl.Enum(DIRECTIONS)),
+        pl.col('pixel_count').cast(pl.UInt32),
+        pl.when(pl.col('dominant_class') >= 0).then(pl.col('dominant_class')).cast(pl.Int64),
+        pl.col('dominant_class_share').fill_nan(None)
+    ])
+    return labels, patches
+
+
+def hotspot_polygons(labels: np.ndarray, patches: pl.DataFrame, transform, crs) -> gpd.GeoDataFrame:
+    """
+    Polygonize hotspot patches into a GeoDataFrame carrying the per-patch statistics.
+
+    Parameters
+    ==========
+    labels: np.ndarray
+        int32 patch ids from `find_hotspots` (0 = no hotspot).
+    patches: pl.DataFrame
+        Per-patch table from `find_hotspots`.
+    transform: affine.Affine
+        Grid transform of `labels`.
+    crs: CRS-like
+        Grid CRS of `labels`.
+
+    Returns
+    =======
+    geopandas.GeoDataFrame
+        One (Multi)Polygon per patch, joined with `patches`.
+    """
+    labels = np.asarray(labels, dtype=np.int32)
+    pieces = features.shapes(labels, mask=labels > 0, connectivity=8, transform=transform)
+    ids, geometries = [], []
+    for geometry, patch_id in pieces:
+        ids.append(int(patch_id))
+        geometries.append(shape(geometry))
+
+    gdf = gpd.GeoDataFrame({'patch_id': ids}, geometry=geometries, crs=crs)
+    if gdf['patch_id'].duplicated().any():
+        gdf = gdf.dissolve(by='patch_id', as_index=False)
+
+    attributes = patches.to_pandas()
+    attributes['patch_id'] = attributes['patch_id'].astype('int64')
+    gdf['patch_id'] = gdf['patch_id'].astype('int64')
+    return gdf.merge(attributes, on='patch_id').sort_values('patch_id').reset_index(drop=True)
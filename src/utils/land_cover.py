@@ -0,0 +1,140 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import polars as pl
+
+
+def valid_codes(values: np.ndarray) -> np.ndarray:
+    """
+    Mask of values that are whole numbers in 0..255, i.e. representable as a uint8 class code.
+
+    NaN, infinities, nodata sentinels such as -9999 or 256 and fractional
+    values are all invalid, so they can never wrap or truncate into a class.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind == 'b':
+        return np.ones(values.shape, dtype=bool)
+    with np.errstate(invalid='ignore'):
+        valid = (values >= 0) & (values <= 255)
+        if values.dtype.kind == 'f':
+            valid &= np.isfinite(values) & (values == np.floor(values))
+    return valid
+
+
+def to_codes(values: np.ndarray, nodata: int = 255) -> np.ndarray:
+    """
+    Convert a class raster to uint8 codes, with `nodata` wherever `valid_codes` is False.
+    """
+    values = np.asarray(values)
+    return np.where(valid_codes(values), values, nodata).astype(np.uint8)
+
+
+class LandCoverScheme:
+    """
+    Class codes, names and colours of one Cecil land-cover dataset.
+
+    Codes are stored as uint8 and names as a polars `Enum`, so labelling a
+    table is a single `replace_strict` lookup into a categorical column
+    rather than a chain of string comparisons.
+
+    Parameters
+    ==========
+    name: str
+        Dataset (subscription) name, e.g. "Land Cover 9-Class".
+    classes: dict[int, str]
+        Class code to class name.
+    documentation: str
+        URL of the dataset documentation.
+    colors: dict[int, str], optional
+        Class code to hex colour for charts.
+    unknown: str
+        Label for codes not in `classes` and for missing data.
+    unknown_color: str
+        Chart colour for `unknown`.
+    """
+
+    def __init__(self, name: str, classes: Dict[int, str], documentation: str,
+                 colors: Optional[Dict[int, str]] = None, unknown: str = 'Unknown',
+                 unknown_color: str = '#cccccc'):
+        self.name = name
+        self.classes = classes
+        self.documentation = documentation
+        self.colors = colors or {}
+        self.unknown = unknown
+        self.unknown_color = unknown_color
+        self.codes = np.array(list(classes), dtype=np.uint8)
+        self.dtype = pl.Enum(self.labels)
+
+    @property
+    def labels(self) -> List[str]:
+        """Class names in registry order, followed by the unknown label."""
+        return list(self.classes.values()) + [self.unknown]
+
+    @property
+    def palette(self) -> List[str]:
+        """Chart colours matching `labels`."""
+        return [self.colors.get(code, self.unknown_color) for code in self.classes] + [self.unknown_color]
+
+    def count(self, values: np.ndarray) -> Dict[str, int]:
+        """
+        Pixel count per label from one `np.bincount`; unknown covers invalid values and unlisted codes.
+        """
+        values = np.asarray(values)
+        # Only valid pixels are binned, so nodata never lands on a class code
+        counts = np.bincount(to_codes(values[valid_codes(values)]).ravel(), minlength=256)
+        per_class = {name: int(counts[code]) for code, name in self.classes.items()}
+        per_class[self.unknown] = int(values.size) - sum(per_class.values())
+        return per_class
+
+    def name_expr(self, column: str = 'land_cover') -> pl.Expr:
+        """
+        Expression mapping a code column to its class name as this scheme's Enum.
+        """
+        return pl.col(column).cast(pl.UInt8, strict=False).replace_strict(
+            self.codes, list(self.classes.values()),
+            default=self.unknown, return_dtype=self.dtype
+        )
+
+    def label(self, df: pl.DataFrame, column: str = 'land_cover',
+              alias: Optional[str] = None) -> pl.DataFrame:
+        """
+        Add the class name for `column` as `alias` (default `<column>_name`).
+        """
+        return df.with_columns(self.name_expr(column).alias(alias or f"{column}_name"))
+
+
+# https://docs.cecil.earth/Land-Cover-9-Class-111ef16bbbe481c0bb41e6e79ec441c8
+LAND_COVER_9_CLASS = LandCoverScheme(
+    name='Land Cover 9-Class',
+    classes={
+        1: 'Water',
+        2: 'Trees',
+        3: 'Grass',
+        4: 'Flooded Vegetation',
+        5: 'Crops',
+        6: 'Scrub/Shrub',
+        7: 'Built Area',
+        8: 'Bare Ground',
+        9: 'Snow/Ice',
+        11: 'Clouds'
+    },
+    documentation='https://docs.cecil.earth/Land-Cover-9-Class-111ef16bbbe481c0bb41e6e79ec441c8'
+)
+
+# https://docs.cecil.earth/SBTN-Natural-Lands-232ef16bbbe48000868ed8c4c82cc8ce
+SBTN_NATURAL_LANDS = LandCoverScheme(
+    name='SBTN Natural Lands',
+    classes={
+        1: 'Natural',
+        0: 'Non-Natural'
+    },
+    documentation='https://docs.cecil.earth/SBTN-Natural-Lands-232ef16bbbe48000868ed8c4c82cc8ce',
+    colors={
+        1: '#2d7f3e',
+        0: '#c44e52'
+    },
+    unknown='Unknown/No Data'
+)
+
+# Schemes by Cecil subscription name
+SCHEMES = {scheme.name: scheme for scheme in (LAND_COVER_9_CLASS, SBTN_NATURAL_LANDS)}
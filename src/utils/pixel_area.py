@@ -0,0 +1,67 @@
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+import xarray as xr
+from pyproj import CRS, Geod, Transformer
+
+SQUARE_METERS_PER_HECTARE = 10_000
+
+_GEOD = Geod(ellps='WGS84')
+
+
+@lru_cache(maxsize=32)
+def pixel_area_rows(crs: str, transform: Tuple[float, ...], height: int) -> np.ndarray:
+    """
+    Geodesic area (m²) of one pixel in each row of a grid, computed once per grid.
+
+    Pixel area in EPSG:4326 (and other cylindrical grids such as EPSG:3857)
+    only changes with latitude, so one value per row describes the whole grid.
+    Each row's first cell is projected to longitude/latitude and measured on
+    the WGS84 ellipsoid.
+
+    Parameters
+    ==========
+    crs: str
+        CRS of the grid as WKT or an authority string.
+    transform: tuple[float, ...]
+        The first six affine coefficients of the grid (north-up, unrotated).
+    height: int
+        Number of rows.
+
+    Returns
+    =======
+    np.ndarray
+        float64 array of length `height` with the area of a pixel in each row.
+    """
+    a, b, c, d, e, f = transform[:6]
+    if b != 0 or d != 0:
+        raise ValueError("Pixel areas require a north-up grid without rotation")
+
+    rows = np.arange(height + 1)
+    edge_x = np.array([c, c + a])
+    edge_y = f + rows * e
+
+    # Corner coordinates of the first cell in every row, in lon/lat
+    xs = np.broadcast_to(edge_x, (height + 1, 2))
+    ys = np.broadcast_to(edge_y[:, None], (height + 1, 2))
+    crs = CRS.from_user_input(crs)
+    if not crs.is_geographic:
+        to_lonlat = Transformer.from_crs(crs, crs.geodetic_crs, always_xy=True)
+        xs, ys = to_lonlat.transform(xs, ys)
+    xs, ys = np.asarray(xs), np.asarray(ys)
+
+    areas = np.empty(height, dtype=np.float64)
+    for row in range(height):
+        lons = [xs[row, 0], xs[row, 1], xs[row + 1, 1], xs[row + 1, 0]]
+        lats = [ys[row, 0], ys[row, 1], ys[row + 1, 1], ys[row + 1, 0]]
+        area, _ = _GEOD.polygon_area_perimeter(lons, lats)
+        areas[row] = abs(area)
+    return areas
+
+
+def pixel_areas(da: xr.DataArray) -> np.ndarray:
+    """
+    Per-row pixel area (m²) for a georeferenced DataArray; see `pixel_area_rows`.
+    """
+    return pixel_area_rows(da.rio.crs.to_wkt(), tuple(da.rio.transform())[:6], da.rio.height)
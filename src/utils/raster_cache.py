@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import rasterio.shutil
+from rasterio.io import MemoryFile
+
+# Bump when the on-disk layout or the key derivation changes
+CACHE_VERSION = 1
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def _round_coordinates(coords, ndigits: int):
+    if isinstance(coords, (list, tuple)):
+        return [_round_coordinates(c, ndigits) for c in coords]
+    return round(float(coords), ndigits)
+
+
+def normalize_geometry(geometry, ndigits: int = 9) -> Union[Dict, str]:
+    """
+    Reduce an AOI to a canonical, JSON-serialisable form for hashing.
+
+    GeoJSON dicts (geometries, Features or FeatureCollections) keep only their
+    geometry members with coordinates rounded to `ndigits`. Earth Engine objects
+    are serialised locally with `serialize()`, which does not hit the network.
+
+    Parameters
+    ==========
+    geometry: dict | ee.ComputedObject
+        The AOI as GeoJSON or as an Earth Engine geometry.
+    ndigits: int
+        Decimal places kept for each coordinate.
+
+    Returns
+    =======
+    dict | str
+        The normalised geometry.
+    """
+    if hasattr(geometry, 'serialize'):
+        return geometry.serialize()
+
+    geom_type = geometry.get('type')
+    if geom_type == 'FeatureCollection':
+        return {
+            'type': geom_type,
+            'features': [normalize_geometry(f, ndigits) for f in geometry['features']]
+        }
+    if geom_type == 'Feature':
+        return normalize_geometry(geometry['geometry'], ndigits)
+    if geom_type == 'GeometryCollection':
+        return {
+            'type': geom_type,
+            'geometries': [normalize_geometry(g, ndigits) for g in geometry['geometries']]
+        }
+    return {'type': geom_type, 'coordinates': _round_coordinates(geometry['coordinates'], ndigits)}
+
+
+class RasterCache:
+    """
+    Content-addressed on-disk cache of GeoTIFF rasters.
+
+    Entries are keyed by a SHA-256 of the request parameters plus the
+    normalised AOI geometry and stored as DEFLATE-compressed Cloud-Optimized
+    GeoTIFFs. Reads refresh an entry's modification time and writes evict the
+    least recently used entries once the cache grows past `max_bytes`.
+
+    Parameters
+    ==========
+    cache_dir: str | Path
+        Directory holding the cached rasters.
+    max_bytes: int
+        Size cap for the cache directory.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def key(self, params: Dict, geometry) -> str:
+        """
+        Derive the cache key for a request.
+
+        Parameters
+        ==========
+        params: dict
+            Every parameter that changes the raster contents (dataset, dates, scale, CRS, ...).
+        geometry: dict | ee.ComputedObject
+            The AOI the raster covers.
+
+        Returns
+        =======
+        str
+            Hex digest identifying the raster.
+        """
+        payload = json.dumps({
+            'version': CACHE_VERSION,
+            'params': params,
+            'geometry': normalize_geometry(geometry)
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.tif"
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        Return the cached raster for `key`, or None on a miss.
+        """
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, src: Union[str, Path, bytes], metadata: Optional[Dict] = None) -> Optional[Path]:
+        """
+        Store `src` under `key` as a compressed COG and return the cached path.
+
+        An entry larger than `max_bytes` on its own is not cached (None is
+        returned), and the entry just written is never evicted by this call.
+
+        Parameters
+        ==========
+        key: str
+            Cache key from `key()`.
+        src: str | Path | bytes
+            Raster file to copy into the cache (it is left in place), or the
+            encoded raster itself.
+        metadata: dict, optional
+            Request parameters written to a JSON sidecar for inspection.
+
+        Returns
+        =======
+        Path | None
+            Location of the cached raster, or None if it exceeds the cache size.
+        """
+        path = self.path(key)
+        fd, tmp_path = tempfile.mkstemp(suffix='.part', dir=self.cache_dir)
+        os.close(fd)
+        try:
+            if isinstance(src, bytes):
+                with MemoryFile(src) as memfile, memfile.open() as dataset:
+                    rasterio.shutil.copy(dataset, tmp_path, driver='COG', compress='DEFLATE')
+            else:
+                rasterio.shutil.copy(str(src), tmp_path, driver='COG', compress='DEFLATE')
+            if os.path.getsize(tmp_path) > self.max_bytes:
+                # Would evict everything including itself; the caller serves it uncached
+                os.remove(tmp_path)
+                return None
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        if metadata is not None:
+            with open(path.with_suffix('.json'), 'w') as f:
+                json.dump(metadata, f, indent=4, sort_keys=True, default=str)
+
+        self.evict(keep=key)
+        return path
+
+    def invalidate(self, key: Optional[str] = None):
+        """
+        Drop the entry for `key`, or every entry when `key` is None.
+        """
+        paths = [self.path(key)] if key is not None else list(self.cache_dir.glob('*.tif'))
+        with self._lock:
+            for path in paths:
+                path.unlink(missing_ok=True)
+                path.with_suffix('.json').unlink(missing_ok=True)
+
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self.cache_dir.glob('*.tif'))
+
+    def evict(self, keep: Optional[str] = None):
+        """
+        Remove least recently used entries until the cache fits in `max_bytes`.
+
+        The entry for `keep` (e.g. the one just written) is never removed.
+        """
+        keep_path = self.path(keep) if keep is not None else None
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob('*.tif'):
+                if path == keep_path:
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            if keep_path is not None:
+                try:
+                    total += keep_path.stat().st_size
+                except FileNotFoundError:
+                    pass
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                path.with_suffix('.json').unlink(missing_ok=True)
+                total -= size
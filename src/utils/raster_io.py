@@ -0,0 +1,45 @@
+import rioxarray
+import xarray as xr
+from rasterio.io import MemoryFile
+
+# Rasters up to this size are decoded/encoded in memory; larger ones fall back to disk
+IN_MEMORY_MAX_BYTES = 256 * 1024 ** 2
+
+
+def open_rasterio_bytes(data: bytes) -> xr.DataArray:
+    """
+    Decode an in-memory GeoTIFF into a (band, y, x) DataArray without touching the filesystem.
+
+    Parameters
+    ==========
+    data: bytes
+        The encoded raster.
+
+    Returns
+    =======
+    xr.DataArray
+        The fully loaded raster with its CRS and transform.
+    """
+    with MemoryFile(data) as memfile, memfile.open() as src:
+        return rioxarray.open_rasterio(src).load()
+
+
+def to_geotiff_bytes(dataset: xr.DataArray, **profile) -> bytes:
+    """
+    Encode a georeferenced DataArray as GeoTIFF bytes without touching the filesystem.
+
+    Parameters
+    ==========
+    dataset: xr.DataArray
+        The raster to encode. Must have its CRS set via `rio.write_crs`.
+    **profile
+        Extra creation options for `rio.to_raster` (e.g. `compress='DEFLATE'`).
+
+    Returns
+    =======
+    bytes
+        The encoded GeoTIFF.
+    """
+    with MemoryFile() as memfile:
+        dataset.rio.to_raster(memfile.name, driver='GTiff', **profile)
+        return memfile.read()
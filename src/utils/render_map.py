@@ -8,6 +8,12 @@ import os
 import webbrowser
 from pathlib import Path
 
+try:
+    from src.utils.geometry import geometry_summary
+except ImportError:
+    # Run directly as `python src/utils/render_map.py`
+    from geometry import geometry_summary
+
 
 def load_geojson(filepath):
     """Load and parse a GeoJSON file."""
@@ -16,19 +22,11 @@ def load_geojson(filepath):
 
 
 def calculate_center(geojson):
-    """Calculate the center point of the GeoJSON features."""
-    if geojson['type'] == 'FeatureCollection':
-        features = geojson['features']
-        if features:
-            # Get the first feature's coordinates
-            coords = features[0]['geometry']['coordinates'][0]
-            # Calculate center from bounding box
-            lons = [coord[0] for coord in coords]
-            lats = [coord[1] for coord in coords]
-            center_lon = (min(lons) + max(lons)) / 2
-            center_lat = (min(lats) + max(lats)) / 2
-            return [center_lon, center_lat]
-    return [0, 0]
+    """Calculate the center point (area-weighted centroid) of all GeoJSON features."""
+    try:
+        return geometry_summary(geojson).centroid
+    except ValueError:
+        return [0, 0]
 
 
 def generate_html(geojson_data, output_path='map.html'):
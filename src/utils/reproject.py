@@ -0,0 +1,185 @@
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+import xarray as xr
+from pyproj import Transformer
+from rasterio.crs import CRS
+from rasterio.transform import Affine
+
+
+class ReprojectionPlan:
+    """
+    Precomputed nearest-neighbour mapping from a source grid onto a target grid.
+
+    For every target pixel the plan stores the flat index of the source pixel
+    whose cell contains the target pixel centre, plus a mask of target pixels
+    that fall outside the source. Applying the plan is a single NumPy gather,
+    so warping many periods or time steps between the same two grids costs
+    one setup plus one indexing pass each.
+
+    Parameters
+    ==========
+    index: np.ndarray
+        Flat source index per target pixel (only meaningful where `valid`).
+    valid: np.ndarray
+        Boolean mask of target pixels covered by the source grid.
+    src_shape: tuple[int, int]
+        (height, width) of the source grid.
+    dst_shape: tuple[int, int]
+        (height, width) of the target grid.
+    """
+
+    def __init__(self, index: np.ndarray, valid: np.ndarray,
+                 src_shape: Tuple[int, int], dst_shape: Tuple[int, int]):
+        self.index = index
+        self.valid = valid
+        self.src_shape = src_shape
+        self.dst_shape = dst_shape
+
+    def apply(self, array: np.ndarray, fill=np.nan) -> np.ndarray:
+        """
+        Warp `array` (..., src_height, src_width) onto the target grid.
+
+        Parameters
+        ==========
+        array: np.ndarray
+            Source values; leading dimensions (e.g. time) are preserved.
+        fill: scalar
+            Value for target pixels outside the source grid. Integer arrays
+            are promoted to float32 when `fill` is NaN.
+
+        Returns
+        =======
+        np.ndarray
+            Array of shape (..., dst_height, dst_width).
+        """
+        array = np.asarray(array)
+        if array.shape[-2:] != self.src_shape:
+            raise ValueError(f"Expected source grid {self.src_shape}, got {array.shape[-2:]}")
+
+        dtype = array.dtype
+        if np.issubdtype(dtype, np.integer) and isinstance(fill, float) and np.isnan(fill):
+            dtype = np.float32
+
+        lead = array.shape[:-2]
+        flat = array.reshape(lead + (-1,))
+        out = np.full(lead + (self.valid.size,), fill, dtype=dtype)
+        out[..., self.valid] = flat[..., self.index[self.valid]]
+        return out.reshape(lead + self.dst_shape)
+
+
+@lru_cache(maxsize=32)
+def get_reprojection_plan(src_crs: str, src_transform: Tuple[float, ...], src_shape: Tuple[int, int],
+                          dst_crs: str, dst_transform: Tuple[float, ...],
+                          dst_shape: Tuple[int, int],
+                          dst_offset: Tuple[int, int] = (0, 0)) -> ReprojectionPlan:
+    """
+    Build (or fetch from cache) the reprojection plan between two grids.
+
+    Arguments are hashable descriptions of the grids, so a plan is computed
+    once per (source grid, target grid) pair and reused afterwards.
+
+    Parameters
+    ==========
+    src_crs, dst_crs: str
+        CRS of each grid as WKT or an authority string.
+    src_transform, dst_transform: tuple[float, ...]
+        The first six affine coefficients of each grid.
+    src_shape, dst_shape: tuple[int, int]
+        (height, width) of each grid.
+    dst_offset: tuple[int, int]
+        (row, column) of the first target pixel, to plan a window of a larger
+        target grid whose transform is `dst_transform`.
+
+    Returns
+    =======
+    ReprojectionPlan
+        The source-to-target pixel mapping.
+    """
+    dst_affine = Affine(*dst_transform[:6])
+    src_affine = Affine(*src_transform[:6])
+    dst_height, dst_width = dst_shape
+    src_height, src_width = src_shape
+
+    # Target pixel centres, in the target CRS
+    row_off, col_off = dst_offset
+    cols, rows = np.meshgrid(np.arange(col_off, col_off + dst_width) + 0.5,
+                             np.arange(row_off, row_off + dst_height) + 0.5)
+    xs, ys = dst_affine * (cols.ravel(), rows.ravel())
+
+    if CRS.from_user_input(src_crs) != CRS.from_user_input(dst_crs):
+        transformer = Transformer.from_crs(dst_crs, src_crs, always_xy=True)
+        xs, ys = transformer.transform(xs, ys)
+
+    src_cols, src_rows = ~src_affine * (np.asarray(xs), np.asarray(ys))
+    src_cols = np.floor(src_cols)
+    src_rows = np.floor(src_rows)
+
+    valid = ((src_cols >= 0) & (src_cols < src_width)
+             & (src_rows >= 0) & (src_rows < src_height))
+
+    index_dtype = np.int32 if src_height * src_width < np.iinfo(np.int32).max else np.int64
+    index = np.zeros(valid.size, dtype=index_dtype)
+    index[valid] = src_rows[valid].astype(index_dtype) * src_width + src_cols[valid].astype(index_dtype)
+
+    return ReprojectionPlan(index, valid, src_shape, dst_shape)
+
+
+def _grid_key(da: xr.DataArray) -> Tuple[str, Tuple[float, ...], Tuple[int, int]]:
+    return da.rio.crs.to_wkt(), tuple(da.rio.transform())[:6], tuple(da.rio.shape)
+
+
+def grids_match(a: xr.DataArray, b: xr.DataArray) -> bool:
+    """
+    Check whether two rasters share CRS, shape and (to float precision) transform.
+    """
+    if a.rio.crs is None or b.rio.crs is None or a.rio.crs != b.rio.crs:
+        return False
+    if tuple(a.rio.shape) != tuple(b.rio.shape):
+        return False
+    return np.allclose(tuple(a.rio.transform())[:6], tuple(b.rio.transform())[:6], rtol=0, atol=1e-9)
+
+
+def reproject_match(source: xr.DataArray, target: xr.DataArray, fill=np.nan) -> xr.DataArray:
+    """
+    Nearest-neighbour equivalent of `source.rio.reproject_match(target)` using a cached plan.
+
+    When both rasters already share a grid (e.g. Earth Engine output requested
+    on the Cecil grid) no resampling happens: `source` simply takes over the
+    target's coordinates.
+
+    Parameters
+    ==========
+    source: xr.DataArray
+        Data to warp, with its CRS written. Extra leading dimensions (e.g.
+        'time') are carried through.
+    target: xr.DataArray
+        Array defining the output grid, with its CRS written.
+    fill: scalar
+        Value for target pixels not covered by `source`.
+
+    Returns
+    =======
+    xr.DataArray
+        `source` on the target grid, with the target's x/y coordinates and CRS.
+    """
+    x_dim, y_dim = source.rio.x_dim, source.rio.y_dim
+    tx, ty = target.rio.x_dim, target.rio.y_dim
+
+    if grids_match(source, target):
+        aligned = source.rename({y_dim: ty, x_dim: tx}) if (y_dim, x_dim) != (ty, tx) else source
+        return aligned.assign_coords({ty: target.coords[ty], tx: target.coords[tx]})
+
+    plan = get_reprojection_plan(*_grid_key(source), *_grid_key(target))
+
+    lead_dims = [d for d in source.dims if d not in (y_dim, x_dim)]
+    values = plan.apply(source.transpose(*lead_dims, y_dim, x_dim).values, fill=fill)
+
+    coords = {d: source.coords[d] for d in lead_dims if d in source.coords}
+    coords[ty] = target.coords[ty]
+    coords[tx] = target.coords[tx]
+
+    result = xr.DataArray(values, dims=lead_dims + [ty, tx], coords=coords,
+                          name=source.name, attrs=source.attrs)
+    return result.rio.write_crs(target.rio.crs)
@@ -0,0 +1,114 @@
+from typing import Dict
+
+import numpy as np
+import xarray as xr
+
+# Number of time steps loaded at once by the streaming reductions
+DEFAULT_TIME_CHUNK = 4
+
+
+def _count_dtype(n_steps: int):
+    if n_steps <= np.iinfo(np.uint8).max:
+        return np.uint8
+    if n_steps <= np.iinfo(np.uint16).max:
+        return np.uint16
+    return np.uint32
+
+
+def _spatial_template(da: xr.DataArray, time_dim: str, values: np.ndarray) -> xr.DataArray:
+    # Keeps the spatial coordinates (and spatial_ref/CRS) while dropping time
+    template = da.isel({time_dim: 0}, drop=True)
+    return template.copy(data=values)
+
+
+def reduce_mode(da: xr.DataArray, time_dim: str = 'time',
+                time_chunk: int = DEFAULT_TIME_CHUNK) -> xr.DataArray:
+    """
+    Per-pixel majority class over time, streamed chunk by chunk.
+
+    Only `time_chunk` steps are loaded at a time (lazy Zarr/dask inputs read
+    just those steps) and per-class counts are kept in the smallest unsigned
+    integer type that fits the series length, so memory is
+    O(classes * pixels) rather than O(time * pixels) in float64.
+
+    Parameters
+    ==========
+    da: xr.DataArray
+        Class codes with a time dimension; NaN marks missing observations.
+    time_dim: str
+        Name of the time dimension.
+    time_chunk: int
+        Number of time steps read per iteration.
+
+    Returns
+    =======
+    xr.DataArray
+        float32 class codes without the time dimension. Ties go to the lowest
+        code; pixels never observed are NaN.
+    """
+    n_steps = da.sizes[time_dim]
+    count_dtype = _count_dtype(n_steps)
+    counts: Dict[float, np.ndarray] = {}
+
+    for start in range(0, n_steps, time_chunk):
+        block = np.asarray(da.isel({time_dim: slice(start, start + time_chunk)})
+                           .transpose(time_dim, ...).values)
+        observed = block[~np.isnan(block)] if block.dtype.kind == 'f' else block
+        for code in np.unique(observed):
+            hits = (block == code).sum(axis=0, dtype=count_dtype)
+            if code in counts:
+                counts[code] += hits
+            else:
+                counts[code] = hits
+
+    spatial_shape = da.isel({time_dim: 0}).shape
+    if not counts:
+        return _spatial_template(da, time_dim, np.full(spatial_shape, np.nan, dtype=np.float32))
+
+    codes = np.array(sorted(counts), dtype=np.float32)
+    stacked = np.stack([counts[c] for c in sorted(counts)])
+    result = codes[stacked.argmax(axis=0)]
+    result[stacked.max(axis=0) == 0] = np.nan
+    return _spatial_template(da, time_dim, result)
+
+
+def reduce_latest(da: xr.DataArray, time_dim: str = 'time',
+                  time_chunk: int = DEFAULT_TIME_CHUNK) -> xr.DataArray:
+    """
+    Per-pixel most recent valid (non-NaN) value, streamed from the newest step back.
+
+    The series is walked backwards `time_chunk` steps at a time and stops as
+    soon as every pixel has a value, so usually only the last few steps are read.
+
+    Parameters
+    ==========
+    da: xr.DataArray
+        Values with a time dimension; NaN marks missing observations.
+    time_dim: str
+        Name of the time dimension.
+    time_chunk: int
+        Number of time steps read per iteration.
+
+    Returns
+    =======
+    xr.DataArray
+        float32 values without the time dimension; NaN where no step is valid.
+    """
+    if time_dim in da.coords:
+        da = da.sortby(time_dim)
+
+    n_steps = da.sizes[time_dim]
+    result = np.full(da.isel({time_dim: 0}).shape, np.nan, dtype=np.float32)
+    missing = np.ones(result.shape, dtype=bool)
+
+    for stop in range(n_steps, 0, -time_chunk):
+        block = np.asarray(da.isel({time_dim: slice(max(0, stop - time_chunk), stop)})
+                           .transpose(time_dim, ...).values)
+        for step in block[::-1]:
+            fill = missing & ~np.isnan(step)
+            result[fill] = step[fill]
+            missing &= ~fill
+        if not missing.any():
+            break
+
+    return _spatial_template(da, time_dim, result)
@@ -0,0 +1,142 @@
+from pathlib import Path
+from typing import Iterator, Tuple, Union
+
+import dask.array
+import numpy as np
+import xarray as xr
+
+from src.utils.reproject import _grid_key, get_reprojection_plan, grids_match
+
+# Side length (pixels) of the square windows processed per step
+DEFAULT_WINDOW_SIZE = 2048
+
+
+class JoinDiagnostics:
+    """
+    Running summary of a joined NDVI / land cover raster.
+
+    Windows are folded in with `update`, so the same checks the in-memory join
+    prints (valid land cover, unique classes) come out of one streaming pass.
+    """
+
+    def __init__(self):
+        self.pixels = 0
+        self.ndvi_valid = 0
+        self.land_cover_valid = 0
+        self.classes = set()
+
+    def update(self, ndvi: np.ndarray, land_cover: np.ndarray):
+        lc_valid = ~np.isnan(land_cover)
+        self.pixels += land_cover.size
+        self.ndvi_valid += int(np.count_nonzero(~np.isnan(ndvi)))
+        self.land_cover_valid += int(np.count_nonzero(lc_valid))
+        self.classes.update(np.unique(land_cover[lc_valid]).tolist())
+
+    def print(self, shape: Tuple[int, ...]):
+        print(f"Combined NDVI shape: {shape}")
+        print(f"Combined land_cover shape: {shape}")
+        print(f"land_cover has data: {self.land_cover_valid > 0}")
+        print(f"land_cover unique values: {np.array(sorted(self.classes))}")
+
+
+def iter_windows(height: int, width: int, window_size: int) -> Iterator[Tuple[slice, slice]]:
+    """
+    Yield (row slice, column slice) pairs tiling a height x width grid.
+    """
+    for row in range(0, height, window_size):
+        for col in range(0, width, window_size):
+            yield slice(row, min(row + window_size, height)), slice(col, min(col + window_size, width))
+
+
+def _reproject_window(source: xr.DataArray, target: xr.DataArray,
+                      rows: slice, cols: slice) -> np.ndarray:
+    # Nearest-neighbour warp of `source` onto one window of `target`, reading
+    # only the block of source pixels that the window actually touches
+    y_dim, x_dim = source.rio.y_dim, source.rio.x_dim
+    src_crs, src_transform, src_shape = _grid_key(source)
+    dst_crs, dst_transform, _ = _grid_key(target)
+    dst_shape = (rows.stop - rows.start, cols.stop - cols.start)
+
+    # Per-window plans are not reused, so bypass the plan cache
+    plan = get_reprojection_plan.__wrapped__(
+        src_crs, src_transform, src_shape,
+        dst_crs, dst_transform, dst_shape, dst_offset=(rows.start, cols.start)
+    )
+
+    out = np.full(plan.valid.size, np.nan, dtype=np.float32)
+    if not plan.valid.any():
+        return out.reshape(dst_shape)
+
+    index = plan.index[plan.valid]
+    src_rows, src_cols = np.divmod(index, src_shape[1])
+    r0, r1 = int(src_rows.min()), int(src_rows.max()) + 1
+    c0, c1 = int(src_cols.min()), int(src_cols.max()) + 1
+
+    block = source.isel({y_dim: slice(r0, r1), x_dim: slice(c0, c1)}).values
+    out[plan.valid] = block[src_rows - r0, src_cols - c0]
+    return out.reshape(dst_shape)
+
+
+def windowed_join(ndvi: xr.DataArray, land_cover: xr.DataArray,
+                  store: Union[str, Path], window_size: int = DEFAULT_WINDOW_SIZE,
+                  diagnostics: bool = True) -> xr.Dataset:
+    """
+    Join NDVI with land cover window by window into a chunked Zarr store.
+
+    The output grid is the NDVI grid. For each window only the matching NDVI
+    block and the source land-cover block it maps onto are loaded, so peak
+    memory is set by `window_size` rather than the AOI size. Lazy inputs
+    (rioxarray with `chunks`, Zarr-backed Cecil data) benefit most.
+
+    Parameters
+    ==========
+    ndvi: xr.DataArray
+        2-D NDVI raster with its CRS written; defines the output grid.
+    land_cover: xr.DataArray
+        2-D land-cover raster with its CRS written.
+    store: str | Path
+        Zarr store to (over)write; chunks match the window size.
+    window_size: int
+        Side length of each processed window, in pixels.
+    diagnostics: bool
+        Print the valid-data and class summary gathered during the pass.
+
+    Returns
+    =======
+    xr.Dataset
+        The joined 'NDVI' and 'land_cover' variables, lazily opened from `store`.
+    """
+    y_dim, x_dim = ndvi.rio.y_dim, ndvi.rio.x_dim
+    height, width = ndvi.rio.shape
+    same_grid = grids_match(land_cover, ndvi)
+
+    coords = {y_dim: ndvi.coords[y_dim], x_dim: ndvi.coords[x_dim]}
+    chunks = (min(window_size, height), min(window_size, width))
+    template = xr.Dataset({
+        name: ((y_dim, x_dim), dask.array.full((height, width), np.nan, dtype=np.float32, chunks=chunks))
+        for name in ('NDVI', 'land_cover')
+    }, coords=coords).rio.write_crs(ndvi.rio.crs)
+    template.to_zarr(store, mode='w', compute=False)
+
+    stats = JoinDiagnostics()
+    for rows, cols in iter_windows(height, width, window_size):
+        ndvi_block = ndvi.isel({y_dim: rows, x_dim: cols}).values.astype(np.float32, copy=False)
+        if same_grid:
+            lc_block = land_cover.isel({land_cover.rio.y_dim: rows, land_cover.rio.x_dim: cols})
+            lc_block = lc_block.values.astype(np.float32, copy=False)
+        else:
+            lc_block = _reproject_window(land_cover, ndvi, rows, cols)
+
+        if diagnostics:
+            stats.update(ndvi_block, lc_block)
+
+        window = xr.Dataset({
+            'NDVI': ((y_dim, x_dim), ndvi_block),
+            'land_cover': ((y_dim, x_dim), lc_block)
+        })
+        window.to_zarr(store, region={y_dim: rows, x_dim: cols})
+
+    if diagnostics:
+        stats.print((height, width))
+
+    return xr.open_zarr(store, decode_coords='all')
@@ -0,0 +1,375 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Tuple
+
+import numpy as np
+import polars as pl
+import xarray as xr
+
+from src.utils.land_cover import to_codes, valid_codes
+from src.utils.pixel_area import SQUARE_METERS_PER_HECTARE
+from src.utils.windowed_join import DEFAULT_WINDOW_SIZE, iter_windows
+
+# Class codes are stored as uint8, so every per-class table has this many slots
+N_CLASSES = 256
+
+# Fixed NDVI bins for per-class histograms and quantiles (bin width 0.01)
+NDVI_RANGE = (-1.0, 1.0)
+DEFAULT_BINS = 200
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def class_codes(land_cover: np.ndarray, values: np.ndarray,
+                weights: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """
+    Flatten a land-cover / value raster pair, keeping only pixels valid in both.
+
+    Parameters
+    ==========
+    land_cover: np.ndarray
+        Class codes (float with NaN for missing, or integer). Values that are
+        not whole numbers in 0..255 count as missing.
+    values: np.ndarray
+        Per-pixel values (e.g. NDVI) of the same shape.
+    weights: np.ndarray, optional
+        Per-pixel weights (e.g. pixel area), broadcastable to the same shape.
+
+    Returns
+    =======
+    tuple[np.ndarray, np.ndarray, np.ndarray | None]
+        uint8 class codes, float64 values and float64 weights (None when not
+        given) of the valid pixels.
+    """
+    land_cover = np.asarray(land_cover)
+    values = np.asarray(values)
+    if land_cover.size != values.size:
+        raise ValueError(f"Array length mismatch: NDVI={values.size}, land_cover={land_cover.size}")
+    land_cover = land_cover.reshape(values.shape)
+
+    # Nodata sentinels (-9999, 256), fractional and NaN codes are dropped rather than wrapped into a class
+    mask = ~np.isnan(values) & valid_codes(land_cover)
+    if weights is not None:
+        weights = np.broadcast_to(weights, values.shape)[mask].astype(np.float64)
+    return to_codes(land_cover[mask]), values[mask].astype(np.float64), weights
+
+
+class ClassStats:
+    """
+    Mergeable per-class accumulator of count, weight, mean and M2 (sum of squared deviations).
+
+    Each chunk is reduced with `np.bincount` (weight and weighted sum, then
+    squared deviations about the chunk mean) and folded in with Chan et al.'s
+    parallel update, so chunks, tiles or periods can be accumulated in any
+    order and on different workers, and merged into the same result a single
+    pass gives. Without weights every pixel weighs 1; with pixel areas as
+    weights the mean is area-weighted and `weight` is the class area in m².
+    """
+
+    def __init__(self):
+        self.count = np.zeros(N_CLASSES, dtype=np.int64)
+        self.weight = np.zeros(N_CLASSES, dtype=np.float64)
+        self.mean = np.zeros(N_CLASSES, dtype=np.float64)
+        self.m2 = np.zeros(N_CLASSES, dtype=np.float64)
+
+    @classmethod
+    def from_arrays(cls, land_cover: np.ndarray, values: np.ndarray,
+                    weights: Optional[np.ndarray] = None) -> 'ClassStats':
+        return cls().update(land_cover, values, weights)
+
+    def update(self, land_cover: np.ndarray, values: np.ndarray,
+               weights: Optional[np.ndarray] = None) -> 'ClassStats':
+        """
+        Fold one chunk of land-cover codes and values (NaN = missing) into the accumulator.
+        """
+        codes, values, weights = class_codes(land_cover, values, weights)
+        chunk = ClassStats()
+        chunk.count = np.bincount(codes, minlength=N_CLASSES)
+        if weights is None:
+            chunk.weight = chunk.count.astype(np.float64)
+            sums = np.bincount(codes, weights=values, minlength=N_CLASSES)
+        else:
+            chunk.weight = np.bincount(codes, weights=weights, minlength=N_CLASSES)
+            sums = np.bincount(codes, weights=weights * values, minlength=N_CLASSES)
+        np.divide(sums, chunk.weight, out=chunk.mean, where=chunk.weight > 0)
+
+        deviations = values - chunk.mean[codes]
+        squared = deviations * deviations
+        if weights is not None:
+            squared *= weights
+        chunk.m2 = np.bincount(codes, weights=squared, minlength=N_CLASSES)
+        return self.merge(chunk)
+
+    def merge(self, other: 'ClassStats') -> 'ClassStats':
+        """
+        Combine another accumulator into this one in place and return self.
+        """
+        weight = self.weight + other.weight
+        present = weight > 0
+        w = weight[present]
+        w_a = self.weight[present]
+        w_b = other.weight[present]
+        delta = other.mean[present] - self.mean[present]
+
+        self.mean[present] += delta * w_b / w
+        self.m2[present] += other.m2[present] + delta * delta * w_a * w_b / w
+        self.count = self.count + other.count
+        self.weight = weight
+        return self
+
+    def to_frame(self, area: bool = False) -> pl.DataFrame:
+        """
+        Per-class table with columns land_cover, mean_ndvi, std_ndvi, pixel_count
+        and, with `area`, area_ha (the accumulated weight converted from m²).
+        """
+        present = np.flatnonzero(self.count)
+        n = self.count[present]
+        weight = self.weight[present]
+        std = np.full(n.shape, np.nan)
+        multi = n > 1
+        # Weighted variance with the n/(n-1) correction; equals the sample variance for unit weights
+        std[multi] = np.sqrt(self.m2[present][multi] / weight[multi] * n[multi] / (n[multi] - 1))
+
+        # Same schema as the original per-pixel polars group_by: Int64 classes, Float32 stats
+        columns = {
+            'land_cover': pl.Series(present, dtype=pl.Int64),
+            'mean_ndvi': pl.Series(self.mean[present], dtype=pl.Float32),
+            'std_ndvi': pl.Series(std, dtype=pl.Float32).fill_nan(None),
+            'pixel_count': pl.Series(n, dtype=pl.UInt32)
+        }
+        if area:
+            columns['area_ha'] = weight / SQUARE_METERS_PER_HECTARE
+        return pl.DataFrame(columns)
+
+
+class ClassHistogram:
+    """
+    Mergeable fixed-bin histogram of values per land-cover class.
+
+    Memory is `N_CLASSES * bins` counts regardless of pixel count; chunks merge
+    by adding counts. Quantiles are interpolated within bins, so they are
+    accurate to one bin width. Values outside `value_range` fall in the edge bins.
+
+    Parameters
+    ==========
+    bins: int
+        Number of equal-width bins.
+    value_range: tuple[float, float]
+        Lower and upper edge of the binned range.
+    """
+
+    def __init__(self, bins: int = DEFAULT_BINS, value_range: Tuple[float, float] = NDVI_RANGE):
+        self.bins = bins
+        self.value_range = value_range
+        self.width = (value_range[1] - value_range[0]) / bins
+        self.counts = np.zeros((N_CLASSES, bins), dtype=np.int64)
+
+    @classmethod
+    def from_arrays(cls, land_cover: np.ndarray, values: np.ndarray, **kwargs) -> 'ClassHistogram':
+        return cls(**kwargs).update(land_cover, values)
+
+    def update(self, land_cover: np.ndarray, values: np.ndarray) -> 'ClassHistogram':
+        """
+        Add one chunk of land-cover codes and values (NaN = missing) to the histogram.
+        """
+        codes, values, _ = class_codes(land_cover, values)
+        bin_index = np.floor((values - self.value_range[0]) / self.width)
+        bin_index = np.clip(bin_index, 0, self.bins - 1).astype(np.int64)
+        flat = np.bincount(codes.astype(np.int64) * self.bins + bin_index,
+                           minlength=N_CLASSES * self.bins)
+        self.counts += flat.reshape(N_CLASSES, self.bins)
+        return self
+
+    def merge(self, other: 'ClassHistogram') -> 'ClassHistogram':
+        """
+        Combine another histogram with the same bins into this one in place and return self.
+        """
+        if (other.bins, other.value_range) != (self.bins, self.value_range):
+            raise ValueError("Histograms must share the same bins to be merged")
+        self.counts += other.counts
+        return self
+
+    def quantiles(self, quantiles=DEFAULT_QUANTILES) -> pl.DataFrame:
+        """
+        Per-class quantiles, one column per quantile named p5, p25, p50, ...
+        """
+        present = np.flatnonzero(self.counts.sum(axis=1))
+        counts = self.counts[present]
+        cumulative = np.cumsum(counts, axis=1)
+        totals = cumulative[:, -1]
+        rows = np.arange(len(present))
+
+        columns = {'land_cover': pl.Series(present, dtype=pl.Int64)}
+        for q in quantiles:
+            target = q * totals
+            # First bin whose cumulative count reaches the target, then interpolate inside it
+            idx = np.minimum((cumulative < target[:, None]).sum(axis=1), self.bins - 1)
+            before = np.where(idx > 0, cumulative[rows, idx - 1], 0)
+            fraction = (target - before) / np.maximum(counts[rows, idx], 1)
+            columns[f"p{round(q * 100):g}"] = self.value_range[0] + (idx + fraction) * self.width
+        return pl.DataFrame(columns)
+
+    def to_frame(self) -> pl.DataFrame:
+        """
+        Long-format histogram (land_cover, bin_start, bin_end, pixel_count) of non-empty bins.
+        """
+        codes, bin_index = np.nonzero(self.counts)
+        bin_start = self.value_range[0] + bin_index * self.width
+        return pl.DataFrame({
+            'land_cover': pl.Series(codes, dtype=pl.Int64),
+            'bin_start': bin_start,
+            'bin_end': bin_start + self.width,
+            'pixel_count': self.counts[codes, bin_index]
+        })
+
+
+def zonal_stats(land_cover: np.ndarray, values: np.ndarray,
+                pixel_area: Optional[np.ndarray] = None) -> pl.DataFrame:
+    """
+    Mean, sample standard deviation and pixel count of `values` per land-cover class.
+
+    Only per-class aggregates are materialised, so memory is O(classes) rather
+    than one DataFrame row per pixel.
+
+    Parameters
+    ==========
+    land_cover: np.ndarray
+        Class codes; NaN marks missing pixels.
+    values: np.ndarray
+        Per-pixel values (NDVI); NaN marks missing pixels.
+    pixel_area: np.ndarray, optional
+        Pixel area in m², per row (see `pixel_area.pixel_areas`) or per pixel.
+        When given, means are area-weighted and an area_ha column is added.
+
+    Returns
+    =======
+    pl.DataFrame
+        Columns land_cover, mean_ndvi, std_ndvi, pixel_count (and area_ha), one
+        row per observed class, sorted by class. std_ndvi is null for
+        single-pixel classes.
+    """
+    weights = None if pixel_area is None else _row_weights(pixel_area, np.shape(values))
+    return ClassStats.from_arrays(land_cover, values, weights).to_frame(area=pixel_area is not None)
+
+
+def _row_weights(pixel_area: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+    # Per-row areas broadcast along columns; full per-pixel grids pass through
+    pixel_area = np.asarray(pixel_area)
+    return pixel_area[:, None] if pixel_area.ndim == 1 else pixel_area
+
+
+def windowed_stats(land_cover: xr.DataArray, values: xr.DataArray,
+                   window_size: int = DEFAULT_WINDOW_SIZE, max_workers: int = 4,
+                   bins: int = DEFAULT_BINS,
+                   pixel_area: Optional[np.ndarray] = None) -> Tuple[ClassStats, ClassHistogram]:
+    """
+    Accumulate per-class statistics and histograms over spatial windows in a bounded worker pool.
+
+    Each window is loaded on its own (lazy Zarr or dask inputs read only that
+    block) and reduced to a `ClassStats` and a `ClassHistogram`; the partial
+    results are merged as they complete.
+
+    Parameters
+    ==========
+    land_cover: xr.DataArray
+        2-D class codes on the same grid as `values`.
+    values: xr.DataArray
+        2-D per-pixel values (NDVI).
+    window_size: int
+        Side length of each window, in pixels.
+    max_workers: int
+        Upper bound on windows reduced concurrently.
+    bins: int
+        Number of histogram bins over the NDVI range.
+    pixel_area: np.ndarray, optional
+        Per-row pixel area in m² of the `values` grid, used as stats weights.
+
+    Returns
+    =======
+    tuple[ClassStats, ClassHistogram]
+        The merged accumulators.
+    """
+    if land_cover.shape != values.shape:
+        raise ValueError(f"Array shape mismatch: NDVI={values.shape}, land_cover={land_cover.shape}")
+    y_dim, x_dim = values.dims
+
+    def reduce_window(window: Tuple[slice, slice]) -> Tuple[ClassStats, ClassHistogram]:
+        rows, cols = window
+        index = {y_dim: rows, x_dim: cols}
+        lc_block = land_cover.isel(index).values
+        value_block = values.isel(index).values
+        weights = None if pixel_area is None else _row_weights(pixel_area[rows], value_block.shape)
+        return (ClassStats.from_arrays(lc_block, value_block, weights),
+                ClassHistogram.from_arrays(lc_block, value_block, bins=bins))
+
+    stats, histogram = ClassStats(), ClassHistogram(bins=bins)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(reduce_window, w) for w in iter_windows(*values.shape, window_size)]
+        for future in as_completed(futures):
+            window_stats, window_histogram = future.result()
+            stats.merge(window_stats)
+            histogram.merge(window_histogram)
+    return stats, histogram
+
+
+def transition_matrix(land_cover_a: np.ndarray, land_cover_b: np.ndarray,
+                      ndvi_a: Optional[np.ndarray] = None, ndvi_b: Optional[np.ndarray] = None,
+                      pixel_area: Optional[np.ndarray] = None) -> pl.DataFrame:
+    """
+    Land-cover transitions between two aligned rasters, from one `np.bincount` over paired codes.
+
+    Each pixel valid in both periods is counted under `code_a * N_CLASSES + code_b`,
+    so the whole matrix (and the optional per-cell NDVI change and area) costs a
+    single O(pixels) pass regardless of how many classes appear.
+
+    Parameters
+    ==========
+    land_cover_a, land_cover_b: np.ndarray
+        Class codes for the earlier and later period on the same grid; NaN and
+        values that are not whole numbers in 0..255 mark missing pixels.
+    ndvi_a, ndvi_b: np.ndarray, optional
+        NDVI for both periods; when given, adds the mean NDVI change per transition.
+    pixel_area: np.ndarray, optional
+        Pixel area in m², per row or per pixel; when given, adds area_ha and
+        area-weights the mean NDVI change.
+
+    Returns
+    =======
+    pl.DataFrame
+        One row per observed (from_class, to_class) pair with pixel_count, and
+        optionally area_ha and mean_ndvi_change (null where NDVI is missing).
+    """
+    land_cover_a = np.asarray(land_cover_a)
+    land_cover_b = np.asarray(land_cover_b)
+    if land_cover_a.shape != land_cover_b.shape:
+        raise ValueError(f"Array shape mismatch: {land_cover_a.shape} vs {land_cover_b.shape}")
+
+    # Missing and nodata codes in either period never form a transition
+    valid = valid_codes(land_cover_a) & valid_codes(land_cover_b)
+    pairs = (to_codes(land_cover_a[valid]).astype(np.int64) * N_CLASSES
+             + to_codes(land_cover_b[valid]))
+    counts = np.bincount(pairs, minlength=N_CLASSES * N_CLASSES)
+    cells = np.flatnonzero(counts)
+
+    columns = {
+        'from_class': pl.Series(cells // N_CLASSES, dtype=pl.Int64),
+        'to_class': pl.Series(cells % N_CLASSES, dtype=pl.Int64),
+        'pixel_count': pl.Series(counts[cells], dtype=pl.UInt32)
+    }
+
+    weights = None
+    if pixel_area is not None:
+        weights = np.broadcast_to(_row_weights(pixel_area, land_cover_a.shape), land_cover_a.shape)[valid]
+        area = np.bincount(pairs, weights=weights, minlength=N_CLASSES * N_CLASSES)
+        columns['area_ha'] = area[cells] / SQUARE_METERS_PER_HECTARE
+
+    if ndvi_a is not None and ndvi_b is not None:
+        delta = (np.asarray(ndvi_b, dtype=np.float64) - np.asarray(ndvi_a, dtype=np.float64))[valid]
+        ok = ~np.isnan(delta)
+        w = np.ones(ok.sum()) if weights is None else weights[ok]
+        sums = np.bincount(pairs[ok], weights=delta[ok] * w, minlength=N_CLASSES * N_CLASSES)
+        totals = np.bincount(pairs[ok], weights=w, minlength=N_CLASSES * N_CLASSES)
+        mean = np.full(cells.shape, np.nan)
+        np.divide(sums[cells], totals[cells], out=mean, where=totals[cells] > 0)
+        columns['mean_ndvi_change'] = pl.Series(mean).fill_nan(None)
+
+    return pl.DataFrame(columns)
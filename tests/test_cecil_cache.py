@@ -0,0 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from src.utils.cecil_cache import CachedCecilClient
+
+
+class _StaticClient:
+    # Serves the same small dataset for every subscription
+    def load_xarray(self, subscription_id):
+        return xr.Dataset(
+            {'land_cover': (('time', 'y', 'x'), np.ones((3, 16, 16), dtype=np.float32))},
+            coords={'time': pd.date_range('2022-01-01', periods=3, freq='YS')}
+        )
+
+
+def test_concurrent_loads_of_one_subscription(tmp_path):
+    client = CachedCecilClient(_StaticClient(), cache_dir=tmp_path)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: client.load_xarray('sub-1', refresh=True), range(16)))
+
+    assert all(ds['land_cover'].shape == (3, 16, 16) for ds in results)
+    assert client.is_fresh('sub-1')
+    assert [p.name for p in tmp_path.iterdir()] == ['sub-1.zarr']
@@ -0,0 +1,14 @@
+from src.utils.change_detection import CHANGE_THRESHOLDS, change_category_colors, change_category_labels
+
+
+def test_category_colors_follow_threshold_count():
+    assert len(change_category_colors()) == len(CHANGE_THRESHOLDS) + 1
+    assert change_category_colors()[2] == '#808080'
+
+    thresholds = (-0.3, -0.2, -0.1, 0.1)
+    labels = change_category_labels(thresholds, ('Severe Loss', 'Strong Loss', 'Moderate Loss',
+                                                 'No Change', 'Gain'))
+    colors = change_category_colors(thresholds)
+    assert len(colors) == len(labels) == 5
+    assert colors[3] == '#808080'
+
@@ -0,0 +1,23 @@
+import numpy as np
+import polars as pl
+
+from src.utils.hotspots import find_hotspots
+
+
+def test_dominant_class_ignores_nodata():
+    delta = np.zeros((6, 6), dtype=np.float32)
+    delta[0:2, 0:2] = -0.5
+    delta[4:6, 4:6] = 0.5
+
+    land_cover = np.full(delta.shape, -9999.0)
+    land_cover[0, 0] = 3
+    # The gain patch has only nodata codes
+
+    labels, patches = find_hotspots(delta, land_cover)
+    assert labels.max() == 2
+    by_direction = {row['direction']: row for row in patches.iter_rows(named=True)}
+    assert by_direction['Loss']['dominant_class'] == 3
+    assert by_direction['Loss']['dominant_class_share'] == 1.0
+    assert by_direction['Gain']['dominant_class'] is None
+    assert by_direction['Gain']['dominant_class_share'] is None
+    assert patches.schema['dominant_class'] == pl.Int64
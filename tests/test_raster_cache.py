@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+
+from src.utils.raster_cache import RasterCache
+
+
+def _write_raster(path, seed=0, size=64):
+    data = np.random.default_rng(seed).random((1, size, size)).astype(np.float32)
+    with rasterio.open(path, 'w', driver='GTiff', width=size, height=size, count=1,
+                       dtype='float32', crs='EPSG:4326',
+                       transform=from_origin(-90, 35, 1e-4, 1e-4)) as dst:
+        dst.write(data)
+    return path
+
+
+def test_put_skips_entry_larger_than_cap(tmp_path):
+    src = _write_raster(tmp_path / 'src.tif')
+    cache = RasterCache(tmp_path / 'cache', max_bytes=1)
+
+    key = cache.key({'product': 'NDVI'}, {'type': 'Point', 'coordinates': [0, 0]})
+    assert cache.put(key, str(src)) is None
+    assert cache.get(key) is None
+    assert list((tmp_path / 'cache').glob('*.tif')) == []
+    # The source is left in place so the caller can open it uncached
+    assert src.exists()
+
+
+def test_put_never_evicts_the_entry_just_written(tmp_path):
+    cache = RasterCache(tmp_path / 'cache')
+    first = cache.put('a', str(_write_raster(tmp_path / 'a.tif', seed=1)))
+    second_src = _write_raster(tmp_path / 'b.tif', seed=2)
+
+    # Cap fits one entry; make the existing entry the most recently used
+    cache.max_bytes = first.stat().st_size + 1024
+    future = first.stat().st_mtime + 3600
+    os.utime(first, (future, future))
+
+    second = cache.put('b', str(second_src))
+    assert second is not None and second.exists()
+    assert cache.get('a') is None
@@ -0,0 +1,36 @@
+import numpy as np
+import polars as pl
+
+from src.utils.zonal_stats import ClassHistogram, class_codes, transition_matrix, zonal_stats
+
+
+def test_class_codes_drop_invalid_land_cover():
+    land_cover = np.array([2.0, -9999.0, 256.0, 7.5, np.nan, 3.0])
+    values = np.array([0.1, 0.2, 0.3, 0.4, 0.5, 0.6])
+
+    codes, kept, _ = class_codes(land_cover, values)
+    assert codes.tolist() == [2, 3]
+    assert kept.tolist() == [0.1, 0.6]
+
+
+def test_zonal_stats_ignore_invalid_land_cover():
+    land_cover = np.array([[2, -9999, 256], [7.5, 2, 241]], dtype=np.float32)
+    values = np.full(land_cover.shape, 0.5, dtype=np.float32)
+
+    stats = zonal_stats(land_cover, values)
+    # -9999 would wrap to 241 and 256 to 0; neither may appear as its own class
+    assert stats['land_cover'].to_list() == [2, 241]
+    assert stats['pixel_count'].to_list() == [2, 1]
+
+    histogram = ClassHistogram.from_arrays(land_cover, values)
+    assert sorted(histogram.to_frame()['land_cover'].unique().to_list()) == [2, 241]
+
+
+def test_transition_matrix_ignores_nodata_and_uses_int64_classes():
+    land_cover_a = np.array([2.0, 2.0, -9999.0, 3.0, np.nan])
+    land_cover_b = np.array([7.0, 7.0, 2.0, 256.0, 3.0])
+
+    transitions = transition_matrix(land_cover_a, land_cover_b)
+    assert transitions.rows() == [(2, 7, 2)]
+    assert transitions.schema['from_class'] == pl.Int64
+    assert transitions.schema['to_class'] == pl.Int64